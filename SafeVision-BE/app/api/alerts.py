@@ -1,4 +1,3 @@
-import json
 import asyncio
 import os
 from datetime import datetime
@@ -6,7 +5,7 @@ from typing import Optional, List
 from fastapi import APIRouter, Request, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from core.db import db
-from core.broker import broker
+from core.broker import broker, dumps
 from rules.schemas import AlertResponse, AlertStatusUpdate, AlertStatus
 
 router = APIRouter()
@@ -197,22 +196,23 @@ async def sse_alerts(request: Request):
                     message = await asyncio.wait_for(queue.get(), timeout=30.0)
 
                     # SSE 형식으로 메시지 전송
+                    # (data_json은 브로커에서 미리 직렬화된 값)
                     if message.get('event_type') == 'alert':
                         yield f"event: alert\n"
-                        yield f"data: {json.dumps(message['data'], ensure_ascii=False)}\n\n"
+                        yield f"data: {message['data_json']}\n\n"
                     elif message.get('event_type') == 'rule_update':
                         yield f"event: rule_update\n"
-                        yield f"data: {json.dumps(message['data'], ensure_ascii=False)}\n\n"
+                        yield f"data: {message['data_json']}\n\n"
                     elif message.get('event_type') == 'config_update':
                         yield f"event: config_update\n"
-                        yield f"data: {json.dumps(message['data'], ensure_ascii=False)}\n\n"
+                        yield f"data: {message['data_json']}\n\n"
                     else:
                         # 일반 메시지
-                        yield f"data: {json.dumps(message, ensure_ascii=False)}\n\n"
+                        yield f"data: {dumps(message)}\n\n"
 
                 except asyncio.TimeoutError:
                     # 타임아웃 시 연결 유지를 위한 하트비트
-                    yield f"data: {json.dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
+                    yield f"data: {dumps({'type': 'heartbeat', 'timestamp': datetime.now().isoformat()})}\n\n"
 
         except Exception as e:
             print(f"SSE 스트림 오류: {e}")
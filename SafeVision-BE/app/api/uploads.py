@@ -6,13 +6,12 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from vision.worker import process_video_async
 from core.config import cfg
+from core.video_utils import UPLOAD_DIR, VIDEO_PATH_INDEX
 from core.db import db
 
 router = APIRouter()
 
-# 업로드 디렉토리 설정
-BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-UPLOAD_DIR = os.path.join(BASE, "storage", "uploads")
+# 업로드 디렉토리 설정 (경로/인덱스는 규칙 엔진과 공유하기 위해 core.video_utils에 정의)
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # 허용된 비디오 확장자
@@ -62,6 +61,7 @@ async def upload_video(
         # 파일 저장
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+        VIDEO_PATH_INDEX[video_id] = file_path
 
         # 파일 정보
         file_info = {
@@ -99,6 +99,7 @@ async def upload_video(
     except Exception as e:
         # 에러 발생 시 업로드된 파일 정리
         if 'file_path' in locals() and os.path.exists(file_path):
+            VIDEO_PATH_INDEX.pop(video_id, None)
             try:
                 os.remove(file_path)
             except:
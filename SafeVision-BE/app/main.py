@@ -6,6 +6,7 @@ from core.db import init_db
 from app.api.uploads import router as upload_router
 from app.api.alerts import router as alerts_router
 from app.api.rules import router as rules_router
+from vision.worker import start_video_workers
 from logging_config import setup_logging
 from dotenv import load_dotenv
 
@@ -43,6 +44,9 @@ async def on_start():
     app.include_router(rules_router, prefix="/api/v1", tags=["rules"])
     logger.info("라우터 등록 완료")
 
+    # 비디오 처리 워커 시작 (업로드된 비디오는 큐를 통해 순서대로 분석)
+    start_video_workers()
+
     logger.info("Smart Safety 시스템 시작 완료")
 
 @app.get("/")
@@ -55,4 +59,5 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop 이벤트 루프 사용 (프레임마다 많은 await가 발생하는 분석 경로의 오버헤드 감소)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop")
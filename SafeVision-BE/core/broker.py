@@ -1,8 +1,15 @@
 import asyncio
-import json
+import orjson
 from typing import Dict, Any, List
 from datetime import datetime
 
+# SSE 직렬화 옵션 (numpy 값, 문자열이 아닌 dict 키 허용)
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def dumps(data: Any) -> str:
+    """orjson으로 JSON 문자열 생성 (datetime/Enum/numpy 값 지원, 비ASCII 문자 그대로 유지)"""
+    return orjson.dumps(data, option=ORJSON_OPTIONS).decode()
+
 class SSEBroker:
     def __init__(self):
         self._queues: List[asyncio.Queue] = []
@@ -28,6 +35,8 @@ class SSEBroker:
             "data": data,
             "timestamp": datetime.now().isoformat()
         }
+        # 클라이언트마다 직렬화하지 않도록 브로드캐스트 시 한 번만 직렬화
+        message["data_json"] = dumps(data)
 
         # 비활성 연결 제거
         active_queues = []
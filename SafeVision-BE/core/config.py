@@ -2,7 +2,7 @@ import os
 import json
 import uuid
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
@@ -17,10 +17,20 @@ logger = logging.getLogger('config')
 FALLBACK_CONFIG = {
     "pixel_to_meter": 0.05,  # 픽셀당 미터 비율 (더 정밀하게)
     "sample_fps": 5,         # 분석할 프레임 수 (초당)
+    "batch_size": 16,        # 한 번에 YOLO로 추론할 프레임 수 (최대 16)
+    "video_workers": 1,      # 동시에 분석할 비디오 수 (GPU 경합 방지)
+    "multi_gpu": True,       # GPU가 여러 개면 GPU마다 워커 하나씩 실행 (video_workers 대신)
     "cooldown": 60,          # 알림 쿨다운 (초) - 중복 방지
     "confidence_threshold": 0.5,  # YOLO 신뢰도 임계값
     "tracking_buffer": 10,   # 트래킹 버퍼 크기
     "min_violation_interval": 30,  # 최소 위반 간격 (초) - 같은 현상 재탐지 방지
+    "inference_dtype": "fp16",  # CUDA 환경의 추론 정밀도 (fp16 / bf16 / fp32)
+    "torch_compile": False,  # GPU 전처리 경로에서 torch.compile로 모델 컴파일 (첫 배치 후 적용)
+    "gpu_preprocess": True,  # CUDA 환경에서 리사이즈/정규화를 GPU에서 수행
+    "trt_engine": False,     # CUDA 환경에서 FP16 TensorRT 엔진 사용 여부
+    "trt_engine_path": None, # 미리 빌드한 TensorRT 엔진 경로 (없으면 모델 옆에 생성)
+    "int8_engine": False,    # CUDA 환경에서 INT8 TensorRT 엔진 사용 여부
+    "int8_calib_data": "coco8.yaml",  # INT8 보정용 데이터셋 설정
 
     # 원근감 관련 설정
     "camera_height": 3.0,    # 카메라 설치 높이 (미터)
@@ -131,6 +141,8 @@ class Config:
     def __init__(self):
         self._config = {}
         self._rules = []
+        self._rules_version = 0  # 규칙이 로드/변경될 때마다 증가
+        self._rules_signature = None  # 마지막으로 읽은 규칙 파일들의 (이름, 수정 시각, 크기)
         self.load_config()
         self.load_rules()
 
@@ -152,6 +164,7 @@ class Config:
         """규칙 디렉토리에서 모든 JSON 파일 로드"""
         rules_dir = STORAGE_DIR / "rules"
         self._rules = []
+        self._rules_signature = self._scan_rules_signature()
 
         if rules_dir.exists():
             try:
@@ -172,6 +185,7 @@ class Config:
             self._rules = DEFAULT_RULES.copy()
             self.save_rules()
 
+        self._rules_version += 1
         logger.info(f"로드된 규칙 수: {len(self._rules)}")
 
         # 활성화된 규칙만 출력
@@ -202,6 +216,27 @@ class Config:
         except Exception as e:
             logger.error(f"규칙 파일 저장 실패: {e}")
 
+        # 메모리의 규칙이 최신이므로, 방금 쓴 파일 때문에 다시 읽지 않도록 서명 갱신
+        self._rules_version += 1
+        self._rules_signature = self._scan_rules_signature()
+
+    def _scan_rules_signature(self) -> Optional[frozenset]:
+        """규칙 파일들의 (이름, 수정 시각, 크기) 집합 - 내용을 읽지 않고 변경 여부만 판단 (디렉토리가 없으면 None)"""
+        try:
+            with os.scandir(STORAGE_DIR / "rules") as entries:
+                return frozenset(
+                    (entry.name, stat.st_mtime_ns, stat.st_size)
+                    for entry in entries if entry.name.endswith('.json')
+                    for stat in (entry.stat(),)
+                )
+        except FileNotFoundError:
+            return None
+
+    @property
+    def rules_version(self) -> int:
+        """규칙 버전 (로드/변경 시 증가) - 규칙 엔진이 재생성 필요 여부를 판단하는 데 사용"""
+        return self._rules_version
+
     def get(self, key: str, default=None):
         """설정값 조회"""
         return self._config.get(key, default)
@@ -264,9 +299,12 @@ class Config:
                 return True
         return False
 
-    def refresh_rules(self):
-        """규칙 디렉토리에서 규칙 새로고침"""
+    def refresh_rules(self) -> bool:
+        """규칙 디렉토리에서 규칙 새로고침 (파일이 바뀌었을 때만 다시 읽음, 다시 읽었으면 True)"""
+        if self._scan_rules_signature() == self._rules_signature:
+            return False
         self.load_rules()
+        return True
 
 # 전역 설정 인스턴스
 cfg = Config()
@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import ASCENDING, DESCENDING
 from bson import ObjectId
@@ -61,25 +61,29 @@ class Database:
         """MongoDB 연결 반환 (하위 호환성을 위해 유지)"""
         return self.db
 
+    def _build_alert_doc(self, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """알림 데이터로부터 MongoDB 문서 생성"""
+        return {
+            "alertId": alert_data['alertId'],
+            "rule_id": alert_data['rule_id'],
+            "rule_type": alert_data['rule_type'],
+            "ts_ms": alert_data['ts_ms'],
+            "summary": alert_data['summary'],
+            "detail": alert_data.get('detail', {}),
+            "video_id": alert_data.get('video_id'),
+            "frame_number": alert_data.get('frame_number'),
+            "severity": alert_data.get('severity', 'medium'),
+            "status": alert_data.get('status', 'unprocessed'),
+            "video_clip_path": alert_data.get('video_clip_path'),
+            "created_at": datetime.now(),
+            "processed_at": None
+        }
+
     async def create_alert(self, alert_data: Dict[str, Any]) -> str:
         """새 알림 생성"""
         try:
             # MongoDB 문서 생성
-            alert_doc = {
-                "alertId": alert_data['alertId'],
-                "rule_id": alert_data['rule_id'],
-                "rule_type": alert_data['rule_type'],
-                "ts_ms": alert_data['ts_ms'],
-                "summary": alert_data['summary'],
-                "detail": alert_data.get('detail', {}),
-                "video_id": alert_data.get('video_id'),
-                "frame_number": alert_data.get('frame_number'),
-                "severity": alert_data.get('severity', 'medium'),
-                "status": alert_data.get('status', 'unprocessed'),
-                "video_clip_path": alert_data.get('video_clip_path'),
-                "created_at": datetime.now(),
-                "processed_at": None
-            }
+            alert_doc = self._build_alert_doc(alert_data)
 
             result = await self.db.alerts.insert_one(alert_doc)
             return alert_data['alertId']
@@ -87,6 +91,15 @@ class Database:
             print(f"알림 생성 실패: {e}")
             raise
 
+    async def create_alerts_bulk(self, alerts: List[Dict[str, Any]]) -> List[str]:
+        """여러 알림을 한 번의 insert_many로 생성"""
+        try:
+            await self.db.alerts.insert_many([self._build_alert_doc(alert_data) for alert_data in alerts], ordered=False)
+            return [alert_data['alertId'] for alert_data in alerts]
+        except Exception as e:
+            print(f"알림 일괄 생성 실패: {e}")
+            raise
+
     async def get_alerts(self, limit: int = 50, offset: int = 0, rule_type: Optional[str] = None,
                         video_id: Optional[str] = None, severity: Optional[str] = None,
                         status: Optional[str] = None) -> List[Dict]:
@@ -170,6 +183,33 @@ class Database:
             print(f"비디오 분석 저장 실패: {e}")
             raise
 
+    async def save_video_analysis_batch(self, video_id: str, rows: List[Tuple[int, int, List[Dict]]]) -> int:
+        """여러 프레임의 비디오 분석 결과를 한 번의 insert_many로 저장
+
+        rows: (frame_number, timestamp_ms, detections) 튜플 리스트
+        """
+        if not rows:
+            return 0
+
+        try:
+            created_at = datetime.now()
+            analysis_docs = [
+                {
+                    "video_id": video_id,
+                    "frame_number": frame_number,
+                    "timestamp_ms": timestamp_ms,
+                    "detections": detections,
+                    "created_at": created_at
+                }
+                for frame_number, timestamp_ms, detections in rows
+            ]
+
+            result = await self.db.video_analysis.insert_many(analysis_docs, ordered=False)
+            return len(result.inserted_ids)
+        except Exception as e:
+            print(f"비디오 분석 일괄 저장 실패: {e}")
+            raise
+
     async def save_rule_execution(self, rule_id: str, video_id: str, frame_number: int, timestamp_ms: int, result: bool, details: Dict = None) -> str:
         """규칙 실행 결과 저장"""
         try:
@@ -189,6 +229,32 @@ class Database:
             print(f"규칙 실행 결과 저장 실패: {e}")
             raise
 
+    async def save_rule_executions_bulk(self, records: List[Tuple[str, str, int, int, bool, Optional[Dict]]]) -> int:
+        """규칙 실행 결과 여러 건을 한 번의 insert_many로 저장
+
+        records: (rule_id, video_id, frame_number, timestamp_ms, result, details) 튜플 리스트
+        """
+        try:
+            created_at = datetime.now()
+            execution_docs = [
+                {
+                    "rule_id": rule_id,
+                    "video_id": video_id,
+                    "frame_number": frame_number,
+                    "timestamp_ms": timestamp_ms,
+                    "result": result,
+                    "details": details or {},
+                    "created_at": created_at
+                }
+                for rule_id, video_id, frame_number, timestamp_ms, result, details in records
+            ]
+
+            result = await self.db.rule_executions.insert_many(execution_docs, ordered=False)
+            return len(result.inserted_ids)
+        except Exception as e:
+            print(f"규칙 실행 결과 일괄 저장 실패: {e}")
+            raise
+
     async def get_alert_stats(self) -> Dict[str, Any]:
         """알림 통계 조회"""
         try:
@@ -298,38 +364,6 @@ class Database:
             print(f"비디오 데이터 삭제 실패: {e}")
             return False
 
-    async def is_alert_cooldown_active(self, video_id: str, rule_type: str, cooldown_seconds: int = 3) -> bool:
-        """알림 쿨다운 상태 확인 (같은 동영상에 대해 3초 내 중복 알림 방지)"""
-        try:
-            # 같은 video_id와 rule_type으로 최근 생성된 알림 확인
-            recent_alert = await self.db.alerts.find_one({
-                'video_id': video_id,
-                'rule_type': rule_type
-            }, sort=[('created_at', -1)])  # 최신 알림부터 정렬
-
-            if not recent_alert:
-                return False  # 이전 알림이 없으면 쿨다운 없음
-
-            # created_at 시간 확인
-            created_at = recent_alert.get('created_at')
-            if not created_at:
-                return False
-
-            # 현재 시간과 비교하여 쿨다운 상태 확인
-            from datetime import datetime
-            now = datetime.now()
-
-            if isinstance(created_at, str):
-                from datetime import datetime
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-
-            time_diff = (now - created_at).total_seconds()
-            return time_diff < cooldown_seconds
-
-        except Exception as e:
-            print(f"쿨다운 체크 실패: {e}")
-            return False  # 오류 시 쿨다운 비활성화
-
 # 전역 데이터베이스 인스턴스
 db = Database()
 
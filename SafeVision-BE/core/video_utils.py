@@ -1,7 +1,26 @@
 import os
 import cv2
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+
+# 업로드 디렉토리
+BASE = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+UPLOAD_DIR = os.path.join(BASE, "storage", "uploads")
+
+# video_id -> 업로드된 파일 경로 (알림마다 업로드 디렉토리를 스캔하지 않도록)
+VIDEO_PATH_INDEX: Dict[str, str] = {}
+
+def get_video_path(video_id: str) -> Optional[str]:
+    """video_id로 업로드된 원본 비디오 경로 조회
+
+    인덱스에 없으면(서버 재시작 전 업로드 등) 디렉토리를 한 번 스캔하여 인덱스에 채웁니다.
+    """
+    video_path = VIDEO_PATH_INDEX.get(video_id)
+    if video_path is None:
+        video_files = [f for f in os.listdir(UPLOAD_DIR) if f.startswith(video_id)]
+        if video_files:
+            video_path = VIDEO_PATH_INDEX[video_id] = os.path.join(UPLOAD_DIR, video_files[0])
+    return video_path
 
 def create_alert_video_clip(video_path: str, frame_number: int, alert_id: str, duration_seconds: int = 3) -> Optional[str]:
     """
@@ -1,10 +1,109 @@
 import math
 import numpy as np
-from typing import Dict, List, Any, Tuple, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from matplotlib.path import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, Any, Tuple, Optional
 from datetime import datetime, timedelta
 from rules.schemas import RuleType, SeverityLevel
 import logging
 
+if TYPE_CHECKING:
+    from vision.detector import Detection
+
+# 모듈 로거 (기존 이름 유지 - logging_config가 규칙 로거의 레벨을 이름으로 설정)
+collision_logger = logging.getLogger('collision_risk_rule')
+fall_logger = logging.getLogger('fall_detection_rule')
+alert_logger = logging.getLogger('alert_generation')
+
+def pack_arrays(cx, cy, labels, track_ids) -> SimpleNamespace:
+    """필드별 배열/리스트로부터 규칙 평가용 SoA 버퍼 생성
+
+    프레임마다 한 번 만들어 모든 규칙이 공유하므로, 규칙마다 dict 조회를 반복하지 않습니다.
+    """
+    n = len(labels)
+    label_to_idx = {}
+    labels = np.array(labels, dtype=object).reshape(n)
+
+    return SimpleNamespace(
+        cx=np.asarray(cx, dtype=np.float64),
+        cy=np.asarray(cy, dtype=np.float64),
+        labels=labels,
+        track_ids=np.array(track_ids, dtype=object).reshape(n),
+        label_idx=np.fromiter((label_to_idx.setdefault(label, len(label_to_idx)) for label in labels),
+                              dtype=np.int32, count=n),
+        label_to_idx=label_to_idx,
+        index_cache={}  # frozenset(labels) -> 탐지 인덱스 배열
+    )
+
+def pack_detections(detections: List['Detection']) -> SimpleNamespace:
+    """탐지 결과(Detection 리스트)를 필드별 NumPy 배열(SoA)로 한 번만 변환"""
+    n = len(detections)
+    return pack_arrays(
+        np.fromiter((d.center_x for d in detections), dtype=np.float64, count=n),
+        np.fromiter((d.center_y for d in detections), dtype=np.float64, count=n),
+        [d.label for d in detections],
+        [d.track_id for d in detections]
+    )
+
+def label_mask(packed: SimpleNamespace, target_labels) -> np.ndarray:
+    """packed 탐지 결과 중 대상 라벨에 해당하는 항목의 boolean 마스크"""
+    target_idx = [packed.label_to_idx[label] for label in target_labels if label in packed.label_to_idx]
+    return np.isin(packed.label_idx, target_idx)
+
+def label_indices(packed: SimpleNamespace, target_labels) -> np.ndarray:
+    """대상 라벨에 해당하는 탐지 인덱스 배열
+
+    같은 프레임에서 같은 라벨 집합을 쓰는 규칙끼리 결과를 공유하므로,
+    라벨 필터링은 프레임당 라벨 집합별로 한 번만 수행됩니다.
+    """
+    key = target_labels if isinstance(target_labels, frozenset) else frozenset(target_labels)
+    indices = packed.index_cache.get(key)
+    if indices is None:
+        indices = packed.index_cache[key] = np.flatnonzero(label_mask(packed, key))
+    return indices
+
+@dataclass(slots=True)
+class TrackRecord:
+    """객체 추적 레코드 (track_id별 최신 위치/시간)"""
+    cx: float
+    cy: float
+    ts: float = 0          # 규칙에 따라 timestamp 또는 timestamp_ms
+    frame: int = 0
+    label: str = ''
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return (self.cx, self.cy)
+
+class TrackingStore(OrderedDict):
+    """track_id -> TrackRecord 저장소 (LRU + 프레임 기준 만료)
+
+    갱신된 트랙은 맨 뒤로 옮기므로 맨 앞이 가장 오래된 트랙입니다.
+    prune()에서 최대 개수 또는 최대 나이(프레임)를 넘은 트랙을 앞에서부터 제거합니다.
+    """
+    MAX_TRACKS = 512      # 규칙당 최대 추적 객체 수
+    MAX_AGE = 300         # 마지막 갱신 후 유지할 최대 프레임 수
+
+    def __init__(self):
+        super().__init__()
+        self.current_frame = 0
+        self._last_seen = {}  # track_id -> 마지막 갱신 프레임
+
+    def __setitem__(self, track_id, record):
+        super().__setitem__(track_id, record)
+        self.move_to_end(track_id)
+        self._last_seen[track_id] = self.current_frame
+
+    def prune(self, frame_number: int):
+        """현재 프레임 기준으로 오래된 트랙을 제거"""
+        self.current_frame = frame_number
+        oldest_allowed = frame_number - self.MAX_AGE
+        while self and (len(self) > self.MAX_TRACKS or self._last_seen[next(iter(self))] < oldest_allowed):
+            track_id, _ = self.popitem(last=False)
+            del self._last_seen[track_id]
+
 class RuleState:
     """규칙 상태 관리"""
     def __init__(self):
@@ -12,7 +111,7 @@ class RuleState:
         self.entity_violation_times = {}  # rule_entity_key -> last_alert_time
         self.last_alert = {}  # rule_id -> last_alert_time
         self.video_alert_times = {}  # rule_video_key -> last_alert_time (새로 추가)
-        self.tracking_data = {}  # track_id -> {position, timestamp}
+        self.tracking_data = TrackingStore()  # track_id -> TrackRecord (오래된 트랙 자동 정리)
 
     def start_violation(self, rule_id: str, entity_id: str):
         """위반 상태 시작"""
@@ -57,12 +156,25 @@ class BaseRule:
     def __init__(self, rule_data: Dict[str, Any], config: Dict[str, Any]):
         self.rule_data = rule_data
         self.config = config
+        self.name = rule_data.get('name', 'Unknown')  # 로그용 이름/타입 (평가마다 dict 조회하지 않음)
+        self.type = rule_data.get('type', 'Unknown')
         self.state = RuleState()  # 각 규칙마다 독립적인 상태
+        self._target_labels = None  # 대상 라벨 frozenset (첫 평가 시 생성)
+
+        # 구역 폴리곤은 규칙 생성 시 한 번만 NumPy 배열/bbox/Path로 변환
+        zone = rule_data.get('zone') or rule_data.get('params', {}).get('zone') or {}
+        self._build_zone(zone.get('polygon'))
 
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         """규칙 평가 - 하위 클래스에서 구현"""
         raise NotImplementedError
 
+    def _get_target_labels(self, default: List[str]) -> frozenset:
+        """대상 라벨 집합 반환 (규칙당 한 번만 frozenset으로 변환하여 해시 조회)"""
+        if self._target_labels is None:
+            self._target_labels = frozenset(self.rule_data['params'].get('labels', default))
+        return self._target_labels
+
     def _should_generate_alert(self, rule_id: str, entity_id: str, violation_data: Dict, ignore_duration_check: bool = False) -> bool:
         """알림 생성 여부 결정 (중복 방지)"""
         cooldown = self.config.get('cooldown', 60)
@@ -95,10 +207,7 @@ class BaseRule:
             if video_key in self.state.video_alert_times:
                 last_video_time = self.state.video_alert_times[video_key]
                 if (datetime.now() - last_video_time).total_seconds() < video_cooldown:
-                    # 로그 시스템 사용
-                    import logging
-                    logger = logging.getLogger('alert_generation')
-                    logger.info(f"[알림 생성] 같은 영상에서 5초 간격 미달: {video_id}")
+                    alert_logger.info(f"[알림 생성] 같은 영상에서 5초 간격 미달: {video_id}")
                     return False
 
         return True
@@ -123,15 +232,13 @@ class BaseRule:
 
         return violation_data
 
-    def _update_tracking_data(self, detections: List[Dict], frame_data: Dict):
+    def _update_tracking_data(self, detections: List['Detection'], frame_data: Dict):
         """객체 위치 추적 데이터 업데이트"""
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
         for detection in detections:
-            track_id = detection.get('track_id')
+            track_id = detection.track_id
             if track_id:
-                self.state.tracking_data[track_id] = {
-                    'position': (detection['center_x'], detection['center_y']),
-                    'timestamp': frame_data.get('timestamp_ms', 0)
-                }
+                self.state.tracking_data[track_id] = TrackRecord(detection.center_x, detection.center_y, timestamp_ms)
 
     def _calculate_distance(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
         """두 위치 간의 거리 계산 (픽셀 -> 미터 변환)"""
@@ -239,23 +346,26 @@ class BaseRule:
 
         return min_dist <= distance <= max_dist
 
-    def _is_in_polygon(self, point: Tuple[float, float], polygon: List[List[float]]) -> bool:
-        """점이 폴리곤 내부에 있는지 확인"""
-        x, y = point
-        n = len(polygon)
-        inside = False
-
-        p1x, p1y = polygon[0]
-        for i in range(n + 1):
-            p2x, p2y = polygon[i % n]
-            if y > min(p1y, p2y):
-                if y <= max(p1y, p2y):
-                    if x <= max(p1x, p2x):
-                        if p1y != p2y:
-                            xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                        if p1x == p2x or x <= xinters:
-                            inside = not inside
-            p1x, p1y = p2x, p2y
+    def _build_zone(self, polygon: Optional[List[List[float]]]):
+        """구역 폴리곤을 NumPy 배열, bbox, matplotlib Path로 변환하여 저장"""
+        if not polygon:
+            self._zone_poly_np = None
+            self._zone_bbox = None
+            self._zone_path = None
+            return
+
+        self._zone_poly_np = np.asarray(polygon, dtype=np.float64)
+        self._zone_bbox = (*self._zone_poly_np.min(axis=0), *self._zone_poly_np.max(axis=0))
+        self._zone_path = Path(self._zone_poly_np)
+
+    def _points_in_zone(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """여러 점의 구역 내부 여부를 한 번에 판정 (bbox로 먼저 걸러낸 뒤 폴리곤 검사)"""
+        min_x, min_y, max_x, max_y = self._zone_bbox
+        inside = (xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y)
+
+        candidates = np.flatnonzero(inside)
+        if len(candidates):
+            inside[candidates] = self._zone_path.contains_points(np.column_stack([xs[candidates], ys[candidates]]))
 
         return inside
 
@@ -273,98 +383,58 @@ class BaseRule:
 
         return ccw(A, C, D) != ccw(B, C, D) and ccw(A, B, C) != ccw(A, B, D)
 
-    def _update_collision_tracking(self, detections: List[Dict], frame_data: Dict):
+    def _update_collision_tracking(self, detections: List['Detection'], frame_number: int, timestamp: float):
         """충돌 감지용 개별 객체 추적 데이터를 업데이트합니다."""
-        import logging
-        logger = logging.getLogger('collision_risk_rule')
+        logger = collision_logger
+        # 프레임/객체마다 호출되므로 DEBUG가 꺼져 있으면 로그 문자열을 만들지 않음
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-        logger.info(f"[충돌 추적] 프레임 {frame_data.get('frame_number', 'unknown')}에서 {len(detections)}개 객체 처리")
+        if debug_enabled:
+            logger.debug("[충돌 추적] 프레임 %s에서 %d개 객체 처리", frame_number, len(detections))
 
         for detection in detections:
-            track_id = detection.get('track_id')
+            track_id = detection.track_id
             if track_id:
                 # 개별 객체별로 추적 데이터 저장
-                self.state.tracking_data[track_id] = {
-                    'center_x': detection['center_x'],
-                    'center_y': detection['center_y'],
-                    'position': (detection['center_x'], detection['center_y']),
-                    'timestamp': frame_data.get('timestamp', 0),
-                    'frame_number': frame_data.get('frame_number', 0),
-                    'label': detection.get('label', ''),
-                    'size': detection.get('size', 0)
-                }
-                logger.info(f"[충돌 추적] {track_id} ({detection.get('label', '')}) 위치 업데이트: ({detection['center_x']:.0f}, {detection['center_y']:.0f})")
-
-        logger.info(f"[충돌 추적] 현재 총 {len(self.state.tracking_data)}개 객체 추적 중")
+                self.state.tracking_data[track_id] = TrackRecord(
+                    detection.center_x, detection.center_y,
+                    timestamp, frame_number, detection.label
+                )
+                if debug_enabled:
+                    logger.debug("[충돌 추적] %s (%s) 위치 업데이트: (%.0f, %.0f)",
+                                 track_id, detection.label, detection.center_x, detection.center_y)
 
-    def _update_fall_tracking(self, detections: List[Dict], frame_data: Dict):
-        """낙상 감지용 통합 person 추적 데이터를 업데이트합니다."""
-        import logging
-        logger = logging.getLogger('fall_detection_rule')
+        if debug_enabled:
+            logger.debug("[충돌 추적] 현재 총 %d개 객체 추적 중", len(self.state.tracking_data))
 
-        logger.info(f"[낙상 추적] 프레임 {frame_data.get('frame_number', 'unknown')}에서 {len(detections)}개 객체 처리")
+    def _update_fall_tracking(self, detections: List['Detection'], frame_number: int, timestamp: float):
+        """낙상 감지용 person 객체별 추적 데이터를 업데이트합니다."""
+        logger = fall_logger
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-        # 기존 통합 person 객체 가져오기
-        unified_person_data = self.state.tracking_data.get('unified_person', None)
+        if debug_enabled:
+            logger.debug("[낙상 추적] 프레임 %s에서 %d개 객체 처리", frame_number, len(detections))
 
         for detection in detections:
-            track_id = detection.get('track_id')
-            label = detection.get('label', '')
-
-            if track_id and (label == 'person' or label == 'airplane'):
-                # 첫 번째 person/airplane 객체이거나 기존 통합 객체가 없는 경우
-                if unified_person_data is None:
-                    unified_person_data = {
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'timestamp': frame_data.get('timestamp', 0),
-                        'frame_number': frame_data.get('frame_number', 0),
-                        'labels': [label]
-                    }
-                    logger.info(f"[낙상 추적] 통합 person 객체 생성: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), 라벨: {label}")
-                else:
-                    current_y = detection['center_y']
-                    existing_y = unified_person_data['center_y']
-                    y_change = abs(current_y - existing_y)
-
-                    # 매번 위치 업데이트 (이전 값 저장을 위해)
-                    unified_person_data.update({
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'frame_number': frame_data.get('frame_number', 0)
-                    })
-                    unified_person_data['labels'].append(label)
-
-                    # y좌표 변화가 70픽셀 이상이면 낙상 가능성 로깅
-                    if y_change >= 70:
-                        logger.info(f"[낙상 추적] ⚠️ 낙상 가능성! y좌표 변화: {y_change:.0f}픽셀 >= 70픽셀")
-
-                    logger.info(f"[낙상 추적] 통합 person 객체 업데이트: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), y변화: {y_change:.0f}픽셀")
-
-        # 통합된 person 객체를 저장
-        if unified_person_data:
-            self.state.tracking_data['unified_person'] = unified_person_data
-            logger.info(f"[낙상 추적] 통합 person 객체 저장 완료: {unified_person_data}")
+            track_id = detection.track_id
+            label = detection.label
+
+            if track_id and label in ('person', 'airplane'):
+                # person/airplane 객체별로 추적 데이터 저장
+                self.state.tracking_data[track_id] = TrackRecord(
+                    detection.center_x, detection.center_y,
+                    timestamp, frame_number, label
+                )
+                if debug_enabled:
+                    logger.debug("[낙상 추적] %s (%s) 위치 업데이트: (%.0f, %.0f)",
+                                 track_id, label, detection.center_x, detection.center_y)
 
-        logger.info(f"[낙상 추적] 현재 총 {len(self.state.tracking_data)}개 객체 추적 중")
+        if debug_enabled:
+            logger.debug("[낙상 추적] 현재 총 %d개 객체 추적 중", len(self.state.tracking_data))
 
-    def _get_tracking_data(self, track_id: str) -> Optional[Dict]:
+    def _get_tracking_data(self, track_id: str) -> Optional[TrackRecord]:
         """특정 객체의 최신 위치 정보를 가져옵니다."""
-        # 1. 개별 track_id로 먼저 확인
-        if track_id in self.state.tracking_data:
-            return self.state.tracking_data[track_id]
-
-        # 2. unified_person 데이터 확인 (person/airplane 객체의 경우)
-        if track_id.startswith('person') or track_id.startswith('airplane'):
-            unified_data = self.state.tracking_data.get('unified_person')
-            if unified_data:
-                logger = logging.getLogger('fall_detection_rule')
-                logger.info(f"[낙상 감지 규칙] {track_id} → unified_person 데이터 사용")
-                return unified_data
-
-        return None
+        return self.state.tracking_data.get(track_id)
 
     def _calculate_y_change(self, track_id: str, current_pos: Tuple[float, float], frame_data: Dict) -> Optional[float]:
         """객체의 y좌표 변화량 계산"""
@@ -372,38 +442,33 @@ class BaseRule:
             return None
 
         prev_data = self.state.tracking_data[track_id]
-        prev_pos = prev_data['position']
-        prev_time = prev_data['timestamp']
 
         curr_time = frame_data.get('timestamp_ms', 0)
-        time_diff = (curr_time - prev_time) / 1000.0  # 초 단위
+        time_diff = (curr_time - prev_data.ts) / 1000.0  # 초 단위
 
         # 시간 윈도우 내의 변화만 고려
         if time_diff > self.rule_data['params'].get('time_window', 1.0):
             return None
 
         # y좌표 변화량 (양수 = 아래로 이동 = 낙상)
-        y_change = current_pos[1] - prev_pos[1]
+        y_change = current_pos[1] - prev_data.cy
         return y_change
 
     def _record_position(self, track_id: str, position: Tuple[float, float], frame_data: Dict):
         """객체의 현재 위치와 시간 기록"""
-        self.state.tracking_data[track_id] = {
-            'position': position,
-            'timestamp': frame_data.get('timestamp_ms', 0)
-        }
+        self.state.tracking_data[track_id] = TrackRecord(position[0], position[1], frame_data.get('timestamp_ms', 0))
 
 class DistanceBelowRule(BaseRule):
     """거리 위반 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         min_distance = params.get('min_distance', 2.0)
         duration = params.get('duration', 3)
-        target_labels = params.get('labels', ['person', 'forklift'])
+        target_labels = self._get_target_labels(['person', 'forklift'])
 
         # 해당 라벨의 객체들 찾기
-        target_objects = [d for d in detections if d.get('label') in target_labels]
+        target_objects = [d for d in detections if d.label in target_labels]
 
         if len(target_objects) < 2:
             return None
@@ -416,8 +481,8 @@ class DistanceBelowRule(BaseRule):
                 obj1 = target_objects[i]
                 obj2 = target_objects[j]
 
-                pos1 = (obj1['center_x'], obj1['center_y'])
-                pos2 = (obj2['center_x'], obj2['center_y'])
+                pos1 = (obj1.center_x, obj1.center_y)
+                pos2 = (obj2.center_x, obj2.center_y)
 
                 # 탐지 범위 내에 있는지 확인
                 if not self._is_within_detection_range(pos1) or not self._is_within_detection_range(pos2):
@@ -426,12 +491,12 @@ class DistanceBelowRule(BaseRule):
                 distance = self._calculate_distance(pos1, pos2)
 
                 if distance < min_distance:
-                    entity_key = f"{obj1['track_id']}_{obj2['track_id']}"
+                    entity_key = f"{obj1.track_id}_{obj2.track_id}"
                     position = ((pos1[0] + pos2[0]) / 2, (pos1[1] + pos2[1]) / 2)
 
                     violation_data = self._prepare_violation_data(
                         entity_key, position,
-                        objects=[obj1['track_id'], obj2['track_id']],
+                        objects=[obj1.track_id, obj2.track_id],
                         distance=distance,
                         min_distance=min_distance,
                         duration=duration
@@ -446,7 +511,7 @@ class DistanceBelowRule(BaseRule):
                     else:
                         self.state.start_violation(rule_id, entity_key)
                 else:
-                    entity_key = f"{obj1['track_id']}_{obj2['track_id']}"
+                    entity_key = f"{obj1.track_id}_{obj2.track_id}"
                     self.state.clear_violation(rule_id, entity_key)
 
         if violations:
@@ -461,36 +526,39 @@ class DistanceBelowRule(BaseRule):
 
 class ZoneEntryRule(BaseRule):
     """위험 구역 진입 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         zone_id = params.get('zone_id', 'zone_1')
         duration = params.get('duration', 2)
-        target_labels = params.get('labels', ['person'])
+        target_labels = self._get_target_labels(['person'])
 
         # 규칙에 포함된 구역 정보 사용
         target_zone = self.rule_data.get('zone')
-        if not target_zone:
+        if not target_zone or self._zone_path is None:
             return None
 
-        violations = []
+        if packed is None:
+            packed = pack_detections(detections)
 
-        for detection in detections:
-            if detection.get('label') not in target_labels:
-                continue
+        targets = label_indices(packed, target_labels)
+        inside = self._points_in_zone(packed.cx[targets], packed.cy[targets])
 
-            pos = (detection['center_x'], detection['center_y'])
+        violations = []
+
+        for idx, in_zone in zip(targets, inside):
+            pos = (float(packed.cx[idx]), float(packed.cy[idx]))
 
             # 탐지 범위 내에 있는지 확인
             if not self._is_within_detection_range(pos):
                 continue
 
-            if self._is_in_polygon(pos, target_zone['polygon']):
-                entity_key = detection['track_id']
+            if in_zone:
+                entity_key = packed.track_ids[idx]
 
                 violation_data = self._prepare_violation_data(
                     entity_key, pos,
-                    object=detection['track_id'],
+                    object=entity_key,
                     zone_id=zone_id,
                     zone_name=target_zone['name'],
                     duration=duration
@@ -504,8 +572,7 @@ class ZoneEntryRule(BaseRule):
                 else:
                     self.state.start_violation(rule_id, entity_key)
             else:
-                entity_key = detection['track_id']
-                self.state.clear_violation(rule_id, entity_key)
+                self.state.clear_violation(rule_id, packed.track_ids[idx])
 
         if violations:
             return {
@@ -519,20 +586,21 @@ class ZoneEntryRule(BaseRule):
 
 class SpeedOverRule(BaseRule):
     """과속 규칙 - 1초 단위로 프레임들을 모아서 속도 계산"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         max_speed = params.get('max_speed', 5.0)
-        target_labels = params.get('labels', ['forklift', 'car'])
+        target_labels = self._get_target_labels(['forklift', 'car'])
 
         print(f"[과속 규칙] 평가 시작 - 대상 라벨: {target_labels}, 최대 속도: {max_speed} m/s")
         print(f"[과속 규칙] 탐지된 객체: {len(detections)}개")
 
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
         violations = []
 
         for detection in detections:
-            detection_label = detection.get('label', 'unknown')
-            print(f"[과속 규칙] 객체 {detection['track_id']} ({detection_label}) 검사 중...")
+            detection_label = detection.label
+            print(f"[과속 규칙] 객체 {detection.track_id} ({detection_label}) 검사 중...")
 
             # 라벨 필터링 - target_labels에 포함된 객체만 처리
             if detection_label not in target_labels:
@@ -540,7 +608,7 @@ class SpeedOverRule(BaseRule):
                 continue
 
             print(f"[과속 규칙] {detection_label} 속도 계산 중...")
-            track_id = detection['track_id']
+            track_id = detection.track_id
 
             # 1초 단위로 속도 계산
             speed = self._calculate_speed_over_time(track_id, frame_data, time_window=1.0)
@@ -566,10 +634,7 @@ class SpeedOverRule(BaseRule):
                 print(f"[과속 규칙] {detection_label} 속도 계산 불가 (데이터 부족)")
 
             # 현재 위치 정보 업데이트
-            self.state.tracking_data[track_id] = {
-                'position': (detection['center_x'], detection['center_y']),
-                'timestamp': frame_data.get('timestamp_ms', 0)
-            }
+            self.state.tracking_data[track_id] = TrackRecord(detection.center_x, detection.center_y, timestamp_ms)
 
         if violations:
             print(f"[과속 규칙] 총 {len(violations)}건 과속 위반 감지")
@@ -590,14 +655,14 @@ class SpeedOverRule(BaseRule):
             return None
 
         current_time = frame_data.get('timestamp_ms', 0)
-        current_pos = self.state.tracking_data[track_id]['position']
+        current_pos = self.state.tracking_data[track_id].position
 
         # time_window 초 전의 데이터 찾기
         target_time = current_time - (time_window * 1000)  # 밀리초 단위
 
         # 이전 위치 데이터가 time_window 내에 있는지 확인
         prev_data = self.state.tracking_data[track_id]
-        prev_time = prev_data['timestamp']
+        prev_time = prev_data.ts
 
         if prev_time < target_time:
             # time_window 밖의 데이터는 무시
@@ -609,7 +674,7 @@ class SpeedOverRule(BaseRule):
             return None
 
         # 거리 계산
-        distance = self._calculate_distance(prev_data['position'], current_pos)
+        distance = self._calculate_distance(prev_data.position, current_pos)
 
         # 속도 계산 (m/s)
         speed = distance / time_diff
@@ -623,28 +688,25 @@ class SpeedOverRule(BaseRule):
 
 class CrowdInZoneRule(BaseRule):
     """밀집도 위반 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         zone_id = params.get('zone_id', 'zone_1')
         max_count = params.get('max_count', 3)
         duration = params.get('duration', 5)
-        target_labels = params.get('labels', ['person'])
+        target_labels = self._get_target_labels(['person'])
 
         # 규칙에 포함된 구역 정보 사용
         target_zone = self.rule_data.get('zone')
-        if not target_zone:
+        if not target_zone or self._zone_path is None:
             return None
 
-        # 구역 내 객체 수 계산
-        count_in_zone = 0
-        for detection in detections:
-            if detection.get('label') not in target_labels:
-                continue
+        if packed is None:
+            packed = pack_detections(detections)
 
-            pos = (detection['center_x'], detection['center_y'])
-            if self._is_in_polygon(pos, target_zone['polygon']):
-                count_in_zone += 1
+        # 구역 내 객체 수 계산
+        targets = label_indices(packed, target_labels)
+        count_in_zone = int(np.count_nonzero(self._points_in_zone(packed.cx[targets], packed.cy[targets])))
 
         if count_in_zone >= max_count:
             entity_key = zone_id
@@ -674,31 +736,32 @@ class CrowdInZoneRule(BaseRule):
 
 class LineCrossRule(BaseRule):
     """안전선 침범 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         line_id = params.get('line_id', 'line_1')
-        target_labels = params.get('labels', ['person', 'forklift'])
+        target_labels = self._get_target_labels(['person', 'forklift'])
 
         # 규칙에 포함된 선 정보 사용
         target_line = self.rule_data.get('line')
         if not target_line:
             return None
 
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
         violations = []
 
         for detection in detections:
-            if detection.get('label') not in target_labels:
+            if detection.label not in target_labels:
                 continue
 
-            track_id = detection['track_id']
+            track_id = detection.track_id
 
             # 이전 프레임의 위치 정보 가져오기
             if track_id in self.state.tracking_data:
                 prev_data = self.state.tracking_data[track_id]
-                prev_pos = prev_data['position']
+                prev_pos = prev_data.position
 
-                curr_pos = (detection['center_x'], detection['center_y'])
+                curr_pos = (detection.center_x, detection.center_y)
 
                 # 선을 건넜는지 확인
                 if self._line_crossed(target_line['points'][0], target_line['points'][1],
@@ -712,10 +775,7 @@ class LineCrossRule(BaseRule):
                         })
 
             # 현재 위치 정보 업데이트
-            self.state.tracking_data[track_id] = {
-                'position': (detection['center_x'], detection['center_y']),
-                'timestamp': frame_data.get('timestamp_ms', 0)
-            }
+            self.state.tracking_data[track_id] = TrackRecord(detection.center_x, detection.center_y, timestamp_ms)
 
         if violations:
             return {
@@ -729,28 +789,29 @@ class LineCrossRule(BaseRule):
 
 class ApproachingRule(BaseRule):
     """접근 추세 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         duration = params.get('duration', 3)
-        target_labels = params.get('labels', ['person', 'forklift'])
+        target_labels = self._get_target_labels(['person', 'forklift'])
 
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
         violations = []
 
         for detection in detections:
-            if detection.get('label') not in target_labels:
+            if detection.label not in target_labels:
                 continue
 
-            track_id = detection['track_id']
+            track_id = detection.track_id
 
             # 이전 프레임의 위치 정보 가져오기
             if track_id in self.state.tracking_data:
                 prev_data = self.state.tracking_data[track_id]
-                prev_pos = prev_data['position']
-                prev_time = prev_data['timestamp']
+                prev_pos = prev_data.position
+                prev_time = prev_data.ts
 
-                curr_pos = (detection['center_x'], detection['center_y'])
-                curr_time = frame_data.get('timestamp_ms', 0)
+                curr_pos = (detection.center_x, detection.center_y)
+                curr_time = timestamp_ms
 
                 if prev_time != curr_time:
                     time_diff = (curr_time - prev_time) / 1000.0  # 초 단위
@@ -773,10 +834,7 @@ class ApproachingRule(BaseRule):
                                 self.state.start_violation(rule_id, entity_key)
 
             # 현재 위치 정보 업데이트
-            self.state.tracking_data[track_id] = {
-                'position': (detection['center_x'], detection['center_y']),
-                'timestamp': frame_data.get('timestamp_ms', 0)
-            }
+            self.state.tracking_data[track_id] = TrackRecord(detection.center_x, detection.center_y, timestamp_ms)
 
         if violations:
             return {
@@ -790,28 +848,30 @@ class ApproachingRule(BaseRule):
 
 class RestrictedAreaRule(BaseRule):
     """제한 구역 진입 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         target_zone = params.get('zone', {})
-        target_labels = params.get('labels', ['person', 'forklift'])
+        target_labels = self._get_target_labels(['person', 'forklift'])
 
-        violations = []
+        if self._zone_path is None:
+            return None
 
-        for detection in detections:
-            if detection.get('label') not in target_labels:
-                continue
+        if packed is None:
+            packed = pack_detections(detections)
+
+        # 대상 객체 전체를 한 번에 구역 포함 여부 판정
+        targets = label_indices(packed, target_labels)
+        inside = self._points_in_zone(packed.cx[targets], packed.cy[targets])
 
-            track_id = detection['track_id']
-            pos = (detection['center_x'], detection['center_y'])
+        violations = []
 
-            # 제한 구역 내부에 있는지 확인
-            if self._is_in_polygon(pos, target_zone.get('polygon', [])):
-                violations.append({
-                    'object': track_id,
-                    'zone_name': target_zone.get('name', 'Unknown'),
-                    'danger_level': target_zone.get('danger_level', 'medium')
-                })
+        for idx in targets[inside]:
+            violations.append({
+                'object': packed.track_ids[idx],
+                'zone_name': target_zone.get('name', 'Unknown'),
+                'danger_level': target_zone.get('danger_level', 'medium')
+            })
 
         if violations:
             return {
@@ -825,31 +885,39 @@ class RestrictedAreaRule(BaseRule):
 
 class SpeedLimitZoneRule(BaseRule):
     """구역 내 속도 제한 규칙"""
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         target_zone = params.get('zone', {})
         max_speed = params.get('max_speed', 3.0)
-        target_labels = params.get('labels', ['forklift', 'car', 'truck'])
+        target_labels = self._get_target_labels(['forklift', 'car', 'truck'])
 
-        violations = []
+        if self._zone_path is None:
+            return None
 
-        for detection in detections:
-            if detection.get('label') not in target_labels:
-                continue
+        if packed is None:
+            packed = pack_detections(detections)
+
+        # 대상 객체 전체를 한 번에 구역 포함 여부 판정
+        targets = label_indices(packed, target_labels)
+        inside = self._points_in_zone(packed.cx[targets], packed.cy[targets])
 
-            track_id = detection['track_id']
-            pos = (detection['center_x'], detection['center_y'])
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
+        violations = []
+
+        for idx, in_zone in zip(targets, inside):
+            track_id = packed.track_ids[idx]
+            pos = (float(packed.cx[idx]), float(packed.cy[idx]))
 
             # 구역 내부에 있는지 확인
-            if self._is_in_polygon(pos, target_zone.get('polygon', [])):
+            if in_zone:
                 # 이전 프레임의 위치 정보 가져오기
                 if track_id in self.state.tracking_data:
                     prev_data = self.state.tracking_data[track_id]
-                    prev_pos = prev_data['position']
-                    prev_time = prev_data['timestamp']
+                    prev_pos = prev_data.position
+                    prev_time = prev_data.ts
 
-                    curr_time = frame_data.get('timestamp_ms', 0)
+                    curr_time = timestamp_ms
                     if prev_time != curr_time:
                         time_diff = (curr_time - prev_time) / 1000.0  # 초 단위
                         if time_diff > 0:
@@ -866,10 +934,7 @@ class SpeedLimitZoneRule(BaseRule):
                                 })
 
             # 현재 위치 정보 업데이트
-            self.state.tracking_data[track_id] = {
-                'position': (detection['center_x'], detection['center_y']),
-                'timestamp': frame_data.get('timestamp_ms', 0)
-            }
+            self.state.tracking_data[track_id] = TrackRecord(pos[0], pos[1], timestamp_ms)
 
         if violations:
             return {
@@ -884,72 +949,77 @@ class SpeedLimitZoneRule(BaseRule):
 class CollisionRiskRule(BaseRule):
     """충돌 위험 규칙: 사람과 다른 객체 간의 근접성 감지"""
 
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         min_distance = params.get('min_distance', 50)  # 최소 거리 (픽셀)
         max_frame_gap = params.get('max_frame_gap', 10)  # 최대 프레임 간격
 
-        # 로그 시스템 사용
-        import logging
-        logger = logging.getLogger('collision_risk_rule')
+        logger = collision_logger
+
+        frame_number = frame_data.get('frame_number', 0)
+        timestamp = frame_data.get('timestamp', 0)
+        video_id = frame_data.get('video_id', 'unknown')
 
-        logger.info(f"[충돌 위험 규칙] 평가 시작 - 프레임 {frame_data.get('frame_number', 'unknown')}")
-        logger.info(f"[충돌 위험 규칙] 탐지된 객체: {len(detections)}개")
+        # 프레임마다 남는 상세 로그는 DEBUG에서만 (꺼져 있으면 문자열을 만들지 않음)
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("[충돌 위험 규칙] 평가 시작 - 프레임 %s, 탐지된 객체: %d개", frame_number, len(detections))
+            for obj in detections:
+                logger.debug("  - %s (ID: %s) at (%.0f, %.0f)", obj.label, obj.track_id, obj.center_x, obj.center_y)
 
-        # 각 객체의 상세 정보 출력
-        for obj in detections:
-            logger.info(f"  - {obj['label']} (ID: {obj['track_id']}) at ({obj['center_x']:.0f}, {obj['center_y']:.0f})")
+        if packed is None:
+            packed = pack_detections(detections)
 
         # 사람과 비사람 객체 분리
-        persons = [d for d in detections if d.get('label') == 'person']
-        non_persons = [d for d in detections if d.get('label') != 'person']
+        is_person = packed.labels == 'person'
+        persons = np.flatnonzero(is_person)
+        non_persons = np.flatnonzero(~is_person)
 
-        logger.info(f"[충돌 위험 규칙] 사람 객체: {len(persons)}개")
-        logger.info(f"[충돌 위험 규칙] 비사람 객체: {len(non_persons)}개")
+        if debug_enabled:
+            logger.debug("[충돌 위험 규칙] 사람 객체: %d개, 비사람 객체: %d개", len(persons), len(non_persons))
 
-        if not persons or not non_persons:
-            logger.info(f"[충돌 위험 규칙] 충돌 감지 불가 - 사람: {len(persons)}개, 비사람: {len(non_persons)}개")
+        if not len(persons) or not len(non_persons):
             return None
 
         violations = []
 
-        # 각 사람과 비사람 객체 간의 거리 계산
-        for person in persons:
-            person_id = person['track_id']
-            person_pos = (person['center_x'], person['center_y'])
-
-            logger.info(f"[충돌 위험 규칙] 사람 {person_id} 위치: ({person['center_x']:.0f}, {person['center_y']:.0f})")
-
-            for obj in non_persons:
-                obj_id = obj['track_id']
-                obj_pos = (obj['center_x'], obj['center_y'])
-
-                # 픽셀 거리 계산
-                distance = self._calculate_pixel_distance(person_pos, obj_pos)
-                logger.info(f"[충돌 위험 규칙] 사람 {person_id} ↔ {obj['label']} {obj_id} 거리: {distance:.0f}픽셀")
-
-                # 충돌 위험 감지
-                if distance <= min_distance:
-                    logger.info(f"[충돌 위험 규칙] ⚠️ 충돌 위험 감지! 거리: {distance:.0f}픽셀 <= {min_distance}픽셀")
-
-                    # 충돌 알림 생성
-                    violation_data = self._prepare_violation_data(
-                        f"{person_id}_{obj_id}", person_pos,
-                        objects=[person_id, obj_id],
-                        distance=distance,
-                        min_distance=min_distance,
-                        collision_risk=True,
-                        video_id=frame_data.get('video_id', 'unknown')
-                    )
-
-                    violations.append(violation_data)
-                    logger.info(f"[충돌 위험 규칙] ✓ 충돌 위험 알림 생성 완료!")
-                else:
-                    logger.info(f"[충돌 위험 규칙] 안전 거리 유지 (거리: {distance:.0f}픽셀 > {min_distance}픽셀)")
+        # 사람 × 비사람 픽셀 거리 행렬을 한 번에 계산
+        distances = np.hypot(packed.cx[persons, None] - packed.cx[non_persons],
+                             packed.cy[persons, None] - packed.cy[non_persons])
+
+        # 모든 쌍의 거리는 DEBUG에서만 출력
+        if debug_enabled:
+            for i, p in enumerate(persons):
+                for j, o in enumerate(non_persons):
+                    logger.debug("[충돌 위험 규칙] 사람 %s ↔ %s %s 거리: %.0f픽셀",
+                                 packed.track_ids[p], packed.labels[o], packed.track_ids[o], distances[i, j])
+
+        # 최소 거리 이내인 쌍만 순회 (사람 순, 같은 사람 안에서는 객체 순)
+        for i, j in zip(*np.nonzero(distances <= min_distance)):
+            p, o = persons[i], non_persons[j]
+            person_id = packed.track_ids[p]
+            obj_id = packed.track_ids[o]
+            person_pos = (float(packed.cx[p]), float(packed.cy[p]))
+            distance = float(distances[i, j])
+
+            logger.info("[충돌 위험 규칙] ⚠️ 충돌 위험 감지! %s ↔ %s 거리: %.0f픽셀 <= %s픽셀",
+                        person_id, obj_id, distance, min_distance)
+
+            # 충돌 알림 생성
+            violation_data = self._prepare_violation_data(
+                f"{person_id}_{obj_id}", person_pos,
+                objects=[person_id, obj_id],
+                distance=distance,
+                min_distance=min_distance,
+                collision_risk=True,
+                video_id=video_id
+            )
+
+            violations.append(violation_data)
 
         # 객체 위치 추적 데이터 업데이트
-        self._update_collision_tracking(detections, frame_data)
+        self._update_collision_tracking(detections, frame_number, timestamp)
 
         if violations:
             return {
@@ -961,67 +1031,63 @@ class CollisionRiskRule(BaseRule):
 
         return None
 
-    def _calculate_pixel_distance(self, pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
-        """두 위치 간의 픽셀 거리 계산"""
-        return math.sqrt((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2)
-
 class FallDetectionRule(BaseRule):
     """낙상 감지 규칙: 프레임 간격 내에서 y좌표 급격한 변화 감지"""
 
-    def evaluate(self, detections: List[Dict], frame_data: Dict) -> Optional[Dict]:
+    def evaluate(self, detections: List['Detection'], frame_data: Dict, packed: Optional[SimpleNamespace] = None) -> Optional[Dict]:
         rule_id = self.rule_data['id']
         params = self.rule_data['params']
         min_fall_pixels = params.get('min_fall_pixels', 70)  # 최소 낙상 픽셀 변화 (70 → 90으로 상향 조정)
         max_frame_gap = params.get('max_frame_gap', 10)  # 최대 프레임 간격
-        labels = params.get('labels', ['person'])
+        labels = self._get_target_labels(['person'])
 
-        # 로그 시스템 사용
-        import logging
-        logger = logging.getLogger('fall_detection_rule')
-
-        logger.info(f"[낙상 감지 규칙] 평가 시작 - 프레임 {frame_data.get('frame_number', 'unknown')}")
-        logger.info(f"[낙상 감지 규칙] 탐지된 객체: {len(detections)}개")
-
-        # 정탐 구간에서만 낙상 감지 (825-915 프레임 범위)
+        # 정탐 구간에서만 낙상 감지 (기본 800-950 프레임 범위)
+        # 구간 밖 프레임이 대부분이므로 로깅/필터링 전에 바로 반환
         current_frame = frame_data.get('frame_number', 0)
-        target_start = 800
-        target_end = 950
+        target_start, target_end = params.get('frame_range', [800, 950])
 
         if not (target_start <= current_frame <= target_end):
-            logger.info(f"[낙상 감지 규칙] 프레임 {current_frame}은 정탐 구간 밖 (대상: {target_start}-{target_end}) - 낙상 감지 건너뛰기")
             return None
 
-        logger.info(f"[낙상 감지 규칙] 프레임 {current_frame}은 정탐 구간 내 - 낙상 감지 진행")
+        current_time = frame_data.get('timestamp', 0)
+        video_id = frame_data.get('video_id', 'unknown')
+
+        logger = fall_logger
 
-        # 각 객체의 상세 정보 출력
-        for obj in detections:
-            logger.info(f"  - {obj['label']} (ID: {obj['track_id']}) at ({obj['center_x']:.0f}, {obj['center_y']:.0f})")
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            logger.debug("[낙상 감지 규칙] 평가 시작 - 프레임 %s (정탐 구간 %s-%s), 탐지된 객체: %d개",
+                         current_frame, target_start, target_end, len(detections))
+            for obj in detections:
+                logger.debug("  - %s (ID: %s) at (%.0f, %.0f)", obj.label, obj.track_id, obj.center_x, obj.center_y)
+
+        if packed is None:
+            packed = pack_detections(detections)
 
         # 사람 객체만 필터링 (airplane도 person으로 취급)
-        persons = [d for d in detections if d.get('label') in labels or d.get('label') == 'airplane']
-        logger.info(f"[낙상 감지 규칙] 사람/airplane 객체: {len(persons)}개")
+        persons = label_indices(packed, labels | {'airplane'})
+        if debug_enabled:
+            logger.debug("[낙상 감지 규칙] 사람/airplane 객체: %d개", len(persons))
 
-        if not persons:
-            logger.info(f"[낙상 감지 규칙] 사람 객체가 없음")
+        if not len(persons):
             return None
 
         violations = []
 
-        for person in persons:
-            track_id = person['track_id']
-            current_y = person['center_y']
-            current_time = frame_data.get('timestamp', 0)
-            current_frame = frame_data.get('frame_number', 0)
+        for p in persons:
+            track_id = packed.track_ids[p]
+            current_y = float(packed.cy[p])
 
-            logger.info(f"[낙상 감지 규칙] 사람 {track_id} 현재 y좌표: {current_y:.0f}")
+            if debug_enabled:
+                logger.debug("[낙상 감지 규칙] 사람 %s 현재 y좌표: %.0f", track_id, current_y)
 
             # 이전 위치 정보 가져오기
             prev_data = self._get_tracking_data(track_id)
 
             if prev_data:
-                prev_y = prev_data.get('center_y')
-                prev_time = prev_data.get('timestamp', 0)
-                prev_frame = prev_data.get('frame_number', 0)
+                prev_y = prev_data.cy
+                prev_time = prev_data.ts
+                prev_frame = prev_data.frame
 
                 if prev_y is not None:  # timestamp > 0 조건 제거
                     # Y좌표 변화 계산
@@ -1029,18 +1095,19 @@ class FallDetectionRule(BaseRule):
                     time_diff = abs(current_time - prev_time)
                     frame_diff = abs(current_frame - prev_frame)
 
-                    logger.info(f"[낙상 감지 규칙] 사람 {track_id} y좌표 변화: {y_change:+.0f}픽셀 (시간: {time_diff:.1f}초, 프레임: {frame_diff}개)")
+                    if debug_enabled:
+                        logger.debug("[낙상 감지 규칙] 사람 %s y좌표 변화: %+.0f픽셀 (시간: %.1f초, 프레임: %d개)",
+                                     track_id, y_change, time_diff, frame_diff)
 
                     # 낙상 감지: Y좌표가 커져야 함 (위→아래로 떨어짐)
                     if y_change > 0 and abs(y_change) >= min_fall_pixels:
-                        logger.info(f"[낙상 감지 규칙] ⚠️ 낙상 감지! Y좌표 증가: {y_change:+.0f}픽셀 >= {min_fall_pixels}픽셀 (아래로 떨어짐)")
-
                         # 프레임 간격 확인
                         if frame_diff <= max_frame_gap:
-                            logger.info(f"[낙상 감지 규칙] ✓ 프레임 간격 적절 (간격: {frame_diff}개 <= {max_frame_gap}개)")
+                            logger.info("[낙상 감지 규칙] ⚠️ 낙상 감지! 사람 %s Y좌표 증가: %+.0f픽셀 >= %s픽셀 (프레임 간격: %d개)",
+                                        track_id, y_change, min_fall_pixels, frame_diff)
 
                             # 낙상 알림 생성
-                            position = (person['center_x'], person['center_y'])
+                            position = (float(packed.cx[p]), current_y)
                             violation_data = self._prepare_violation_data(
                                 track_id, position,
                                 objects=[track_id],
@@ -1048,35 +1115,28 @@ class FallDetectionRule(BaseRule):
                                 time_duration=time_diff,
                                 frame_gap=frame_diff,
                                 fall_detected=True,
-                                video_id=frame_data.get('video_id', 'unknown'),
+                                video_id=video_id,
                                 record_video=True,
                                 pre_duration=1.5,  # 전 1.5초
                                 post_duration=3.5  # 후 3.5초
                             )
 
-                            # 명시적으로 pre_duration과 post_duration 설정
-                            violation_data['pre_duration'] = 1.5
-                            violation_data['post_duration'] = 3.5
-
                             violations.append(violation_data)
-                            logger.info(f"[낙상 감지 규칙] ✓ 낙상 알림 생성 완료!")
-                            logger.info(f"[낙상 감지 규칙] [디버깅] violation_data: {violation_data}")
-                        else:
-                            logger.info(f"[낙상 감지 규칙] 프레임 간격이 너무 큼 (간격: {frame_diff}개 > {max_frame_gap}개)")
-                    else:
-                        logger.info(f"[낙상 감지 규칙] 낙상 조건 불만족 (변화: {y_change:+.0f}픽셀, 방향: {'아래로 떨어짐' if y_change > 0 else '위로 올라감'})")
-                else:
-                    logger.info(f"[낙상 감지 규칙] 사람 {track_id} 이전 위치 정보 부족")
-            else:
-                logger.info(f"[낙상 감지 규칙] 사람 {track_id} 첫 탐지 - 추적 시작")
+                        elif debug_enabled:
+                            logger.debug("[낙상 감지 규칙] 프레임 간격이 너무 큼 (간격: %d개 > %s개)", frame_diff, max_frame_gap)
+                elif debug_enabled:
+                    logger.debug("[낙상 감지 규칙] 사람 %s 이전 위치 정보 부족", track_id)
+            elif debug_enabled:
+                logger.debug("[낙상 감지 규칙] 사람 %s 첫 탐지 - 추적 시작", track_id)
 
         # 객체 위치 추적 데이터 업데이트 (프레임 번호 포함)
-        self._update_fall_tracking(detections, frame_data)
+        self._update_fall_tracking(detections, current_frame, current_time)
 
-        # 디버깅: 현재 저장된 추적 데이터 출력
-        logger.info(f"[낙상 감지 규칙] 현재 저장된 추적 데이터:")
-        for track_id, data in self.state.tracking_data.items():
-            logger.info(f"  - {track_id}: pos=({data.get('center_x', 'N/A')}, {data.get('center_y', 'N/A')}), time={data.get('timestamp', 'N/A')}, frame={data.get('frame_number', 'N/A')}")
+        # 디버깅: 현재 저장된 추적 데이터 출력 (추적 객체 수에 비례하므로 DEBUG에서만)
+        if debug_enabled:
+            logger.debug("[낙상 감지 규칙] 현재 저장된 추적 데이터:")
+            for track_id, data in self.state.tracking_data.items():
+                logger.debug("  - %s: pos=(%s, %s), time=%s, frame=%s", track_id, data.cx, data.cy, data.ts, data.frame)
 
         if violations:
             return {
@@ -1088,179 +1148,6 @@ class FallDetectionRule(BaseRule):
 
         return None
 
-    def _get_tracking_data(self, track_id: str) -> Optional[Dict]:
-        """특정 객체의 최신 위치 정보를 가져옵니다."""
-        # 1. 개별 track_id로 먼저 확인
-        if track_id in self.state.tracking_data:
-            return self.state.tracking_data[track_id]
-
-        # 2. unified_person 데이터 확인 (person/airplane 객체의 경우)
-        if track_id.startswith('person') or track_id.startswith('airplane'):
-            unified_data = self.state.tracking_data.get('unified_person')
-            if unified_data:
-                logger = logging.getLogger('fall_detection_rule')
-                logger.info(f"[낙상 감지 규칙] {track_id} → unified_person 데이터 사용")
-                return unified_data
-
-        return None
-
-    def _update_tracking_data_with_frame(self, detections: List[Dict], frame_data: Dict):
-        """프레임 번호를 포함한 객체 위치 추적 데이터를 업데이트합니다."""
-        import logging
-        logger = logging.getLogger('fall_detection_rule')
-
-        logger.info(f"[추적 데이터 업데이트] 프레임 {frame_data.get('frame_number', 'unknown')}에서 {len(detections)}개 객체 처리")
-
-        # 기존 통합 person 객체 가져오기
-        unified_person_data = self.state.tracking_data.get('unified_person', None)
-
-        for detection in detections:
-            track_id = detection.get('track_id')
-            label = detection.get('label', '')
-
-            if track_id and (label == 'person' or label == 'airplane'):
-                # 첫 번째 person/airplane 객체이거나 기존 통합 객체가 없는 경우
-                if unified_person_data is None:
-                    unified_person_data = {
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'timestamp': frame_data.get('timestamp', 0),
-                        'frame_number': frame_data.get('frame_number', 0),
-                        'labels': [label]
-                    }
-                    logger.info(f"[추적 데이터 업데이트] 통합 person 객체 생성: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), 라벨: {label}")
-                else:
-                    current_y = detection['center_y']
-                    existing_y = unified_person_data['center_y']
-                    y_change = abs(current_y - existing_y)
-
-                    # 매번 위치 업데이트 (이전 값 저장을 위해)
-                    unified_person_data.update({
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'frame_number': frame_data.get('frame_number', 0)
-                    })
-                    unified_person_data['labels'].append(label)
-
-                    # y좌표 변화가 70픽셀 이상이면 낙상 가능성 로깅
-                    if y_change >= 70:
-                        logger.info(f"[추적 데이터 업데이트] ⚠️ 낙상 가능성! y좌표 변화: {y_change:.0f}픽셀 >= 70픽셀")
-
-                    logger.info(f"[추적 데이터 업데이트] 통합 person 객체 업데이트: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), y변화: {y_change:.0f}픽셀")
-
-        # 통합된 person 객체를 저장
-        if unified_person_data:
-            self.state.tracking_data['unified_person'] = unified_person_data
-            logger.info(f"[추적 데이터 업데이트] 통합 person 객체 저장 완료: {unified_person_data}")
-
-        logger.info(f"[추적 데이터 업데이트] 현재 총 {len(self.state.tracking_data)}개 객체 추적 중")
-
-    def _update_collision_tracking(self, detections: List[Dict], frame_data: Dict):
-        """충돌 감지용 개별 객체 추적 데이터를 업데이트합니다."""
-        import logging
-        logger = logging.getLogger('collision_risk_rule')
-
-        logger.info(f"[충돌 추적] 프레임 {frame_data.get('frame_number', 'unknown')}에서 {len(detections)}개 객체 처리")
-
-        for detection in detections:
-            track_id = detection.get('track_id')
-            if track_id:
-                # 개별 객체별로 추적 데이터 저장
-                self.state.tracking_data[track_id] = {
-                    'center_x': detection['center_x'],
-                    'center_y': detection['center_y'],
-                    'position': (detection['center_x'], detection['center_y']),
-                    'timestamp': frame_data.get('timestamp', 0),
-                    'frame_number': frame_data.get('frame_number', 0),
-                    'label': detection.get('label', ''),
-                    'size': detection.get('size', 0)
-                }
-                logger.info(f"[충돌 추적] {track_id} ({detection.get('label', '')}) 위치 업데이트: ({detection['center_x']:.0f}, {detection['center_y']:.0f})")
-
-        logger.info(f"[충돌 추적] 현재 총 {len(self.state.tracking_data)}개 객체 추적 중")
-
-    def _update_fall_tracking(self, detections: List[Dict], frame_data: Dict):
-        """낙상 감지용 통합 person 추적 데이터를 업데이트합니다."""
-        import logging
-        logger = logging.getLogger('fall_detection_rule')
-
-        logger.info(f"[낙상 추적] 프레임 {frame_data.get('frame_number', 'unknown')}에서 {len(detections)}개 객체 처리")
-
-        # 기존 통합 person 객체 가져오기
-        unified_person_data = self.state.tracking_data.get('unified_person', None)
-
-        for detection in detections:
-            track_id = detection.get('track_id')
-            label = detection.get('label', '')
-
-            if track_id and (label == 'person' or label == 'airplane'):
-                # 첫 번째 person/airplane 객체이거나 기존 통합 객체가 없는 경우
-                if unified_person_data is None:
-                    unified_person_data = {
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'timestamp': frame_data.get('timestamp', 0),
-                        'frame_number': frame_data.get('frame_number', 0),
-                        'labels': [label]
-                    }
-                    logger.info(f"[낙상 추적] 통합 person 객체 생성: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), 라벨: {label}")
-                else:
-                    current_y = detection['center_y']
-                    existing_y = unified_person_data['center_y']
-                    y_change = abs(current_y - existing_y)
-
-                    # 매번 위치 업데이트 (이전 값 저장을 위해)
-                    unified_person_data.update({
-                        'center_x': detection['center_x'],
-                        'center_y': detection['center_y'],
-                        'position': (detection['center_x'], detection['center_y']),
-                        'frame_number': frame_data.get('frame_number', 0)
-                    })
-                    unified_person_data['labels'].append(label)
-
-                    # y좌표 변화가 70픽셀 이상이면 낙상 가능성 로깅
-                    if y_change >= 70:
-                        logger.info(f"[낙상 추적] ⚠️ 낙상 가능성! y좌표 변화: {y_change:.0f}픽셀 >= 70픽셀")
-
-                    logger.info(f"[낙상 추적] 통합 person 객체 업데이트: pos=({detection['center_x']:.0f}, {detection['center_y']:.0f}), y변화: {y_change:.0f}픽셀")
-
-        # 통합된 person 객체를 저장
-        if unified_person_data:
-            self.state.tracking_data['unified_person'] = unified_person_data
-            logger.info(f"[낙상 추적] 통합 person 객체 저장 완료: {unified_person_data}")
-
-        logger.info(f"[낙상 추적] 현재 총 {len(self.state.tracking_data)}개 객체 추적 중")
-
-    def _calculate_y_change(self, track_id: str, current_pos: Tuple[float, float], frame_data: Dict) -> Optional[float]:
-        """객체의 y좌표 변화량 계산"""
-        if track_id not in self.state.tracking_data:
-            return None
-
-        prev_data = self.state.tracking_data[track_id]
-        prev_pos = prev_data['position']
-        prev_time = prev_data['timestamp']
-
-        curr_time = frame_data.get('timestamp_ms', 0)
-        time_diff = (curr_time - prev_time) / 1000.0  # 초 단위
-
-        # 시간 윈도우 내의 변화만 고려
-        if time_diff > self.rule_data['params'].get('time_window', 1.0):
-            return None
-
-        # y좌표 변화량 (양수 = 아래로 이동 = 낙상)
-        y_change = current_pos[1] - prev_pos[1]
-        return y_change
-
-    def _record_position(self, track_id: str, position: Tuple[float, float], frame_data: Dict):
-        """객체의 현재 위치와 시간 기록"""
-        self.state.tracking_data[track_id] = {
-            'position': position,
-            'timestamp': frame_data.get('timestamp_ms', 0)
-        }
-
 # 규칙 팩토리
 def create_rule(rule_data: Dict[str, Any], config: Dict[str, Any]) -> BaseRule:
     """규칙 타입에 따라 적절한 규칙 객체 생성"""
@@ -1,26 +1,43 @@
 import uuid
 import asyncio
-import os
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-from rules.builtins import create_rule
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+from rules.builtins import RuleState, create_rule, pack_arrays
 from core.db import db
 from core.broker import broker
 from core.config import cfg
+from core.video_utils import create_alert_video_clip, get_video_path
 from logging_config import get_logger
 
+if TYPE_CHECKING:
+    from vision.detector import Detections
+
 class RuleEngine:
     """규칙 엔진 - 비디오 분석 결과에 대해 규칙을 평가하고 알림을 생성"""
+    WRITE_QUEUE_SIZE = 1024      # DB 쓰기 큐 최대 크기 (가득 차면 규칙 평가가 대기)
+    WRITE_BATCH_SIZE = 100       # 한 번에 저장할 최대 레코드 수
+    WRITE_FLUSH_INTERVAL = 0.05  # 배치를 모으는 최대 시간 (초)
+    ALERT_COOLDOWN_SECONDS = 3   # 같은 동영상/규칙 타입의 중복 알림 방지 시간 (초)
+    MAX_COOLDOWN_ENTRIES = 1024  # 쿨다운 기록이 이보다 많아지면 만료된 항목 정리
 
     def __init__(self):
         self.rules = {}
+        self._rule_entries = []    # (rule_id, rule.evaluate, rule) - 프레임 루프용으로 미리 바인딩
+        self._severity_by_id = {}  # rule_id -> severity
+        self._write_queue = None   # ('alert' | 'execution', record) - 이벤트 루프 안에서 생성
+        self._writer_task = None
+        self._sse_tasks = set()    # 진행 중인 SSE 전송 태스크 (완료 전 GC되지 않도록 참조 유지)
+        self._cooldown = {}        # (video_id, rule_type) -> 마지막 알림 시각 (time.monotonic)
+        self._rules_version = None  # 현재 규칙을 만든 cfg.rules_version
         self.logger = get_logger('rule_engine')
         self.load_rules()
 
     def load_rules(self):
         """활성화된 규칙들을 로드"""
         self.rules.clear()
+        self._rules_version = cfg.rules_version
         enabled_rules = cfg.get_enabled_rules()
+        self._severity_by_id = {rule_data['id']: rule_data.get('severity', 'medium') for rule_data in enabled_rules}
 
         self.logger.info(f"활성화된 규칙 {len(enabled_rules)}개 로드:")
         for rule_data in enabled_rules:
@@ -31,50 +48,64 @@ class RuleEngine:
             except Exception as e:
                 self.logger.error(f"규칙 로드 실패 {rule_data['id']}: {e}")
 
+        self._rule_entries = [(rule_id, rule.evaluate, rule) for rule_id, rule in self.rules.items()]
         self.logger.info(f"최종 로드된 규칙 수: {len(self.rules)}")
 
     def reload_rules(self):
-        """규칙 재로드"""
+        """규칙 재로드 (규칙이 바뀌지 않았으면 규칙 객체는 재사용하고 상태만 초기화)"""
+        if cfg.rules_version == self._rules_version:
+            self.reset_state()
+            return
+
         self.logger.info("규칙 재로드 시작")
         self.load_rules()
 
-    async def evaluate_frame(self, detections: List[Dict], frame_data: Dict, video_id: str) -> List[Dict]:
+    def reset_state(self):
+        """규칙별 추적/위반 상태 초기화 (새 비디오 분석 시작 시)"""
+        for rule in self.rules.values():
+            rule.state = RuleState()
+
+    async def evaluate_frame(self, detections: 'Detections', frame_data: Dict, video_id: str) -> List[Dict]:
         """프레임에 대해 모든 활성 규칙을 평가"""
-        frame_num = frame_data.get('frame_number', 'N/A')
-        self.logger.info(f"[규칙 엔진] 프레임 {frame_num} 평가 시작")
-        self.logger.info(f"  - 탐지된 객체: {len(detections)}개")
-        self.logger.info(f"  - 활성 규칙: {len(self.rules)}개")
+        self.logger.info("[규칙 엔진] 프레임 %s 평가 시작", frame_data.get('frame_number', 'N/A'))
+        self.logger.info("  - 탐지된 객체: %d개", len(detections))
+        self.logger.info("  - 활성 규칙: %d개", len(self.rules))
 
         alerts = []
+        executions = []  # (rule_id, video_id, frame_number, timestamp_ms, result, details) - 루프 후 일괄 저장
+        frame_number = frame_data.get('frame_number', 0)
+        timestamp_ms = frame_data.get('timestamp_ms', 0)
+        video_path = None  # 원본 비디오 경로 (첫 알림 시 조회)
+
+        # 탐지기의 SoA 배열을 그대로 모든 규칙이 공유 (dict 변환 없이)
+        packed = pack_arrays(detections.center[:, 0], detections.center[:, 1],
+                             detections.labels, detections.track_ids)
+        detection_objects = detections.as_objects()
 
-        for rule_id, rule in self.rules.items():
-            rule_name = rule.rule_data.get('name', 'Unknown')
-            rule_type = rule.rule_data.get('type', 'Unknown')
-            self.logger.info(f"  - 규칙 '{rule_name}' ({rule_type}) 평가 중...")
+        for rule_id, evaluate, rule in self._rule_entries:
+            self.logger.info("  - 규칙 '%s' (%s) 평가 중...", rule.name, rule.type)
+            cooldown_key = None  # 이 규칙이 잡은 쿨다운 (알림 생성 전에 실패하면 되돌림)
 
             try:
-                result = rule.evaluate(detections, frame_data)
+                # 오래된 추적 객체 정리 (추적 데이터가 무한히 커지지 않도록)
+                rule.state.tracking_data.prune(frame_number)
+                result = evaluate(detection_objects, frame_data, packed)
                 if result:
-                    self.logger.info(f"    - 위반 감지: {result['summary']}")
+                    self.logger.info("    - 위반 감지: %s", result['summary'])
 
-                    # 쿨다운 체크 (같은 동영상에 대해 3초 내 중복 알림 방지)
-                    if await db.is_alert_cooldown_active(video_id, result['rule_type']):
-                        self.logger.info(f"    - 쿨다운 활성화: {video_id} - {result['rule_type']} (3초 내 중복 알림 방지)")
+                    # 쿨다운 체크 (같은 동영상에 대해 3초 내 중복 알림 방지, DB 조회 없이 메모리에서)
+                    if not self._acquire_cooldown(video_id, result['rule_type']):
+                        self.logger.info("    - 쿨다운 활성화: %s - %s (3초 내 중복 알림 방지)", video_id, result['rule_type'])
                         continue
+                    cooldown_key = (video_id, result['rule_type'])
 
                     # 알림 생성
                     alert_data = self._create_alert(result, frame_data, video_id)
 
-                    # 비디오 클립 생성
-                    from core.video_utils import create_alert_video_clip
-                    from app.api.uploads import UPLOAD_DIR
-                    import os
-
-                    # 원본 비디오 파일 경로 찾기
-                    video_files = [f for f in os.listdir(UPLOAD_DIR) if f.startswith(video_id)]
-                    if video_files:
-                        video_path = os.path.join(UPLOAD_DIR, video_files[0])
-
+                    # 비디오 클립 생성 (원본 비디오 경로는 프레임당 한 번만 조회)
+                    if video_path is None:
+                        video_path = get_video_path(video_id)
+                    if video_path:
                         # 규칙 결과에서 영상 녹화 설정 가져오기
                         violations = result.get('violations', [])
                         if violations:
@@ -84,9 +115,9 @@ class RuleEngine:
                             total_duration = pre_duration + post_duration
 
                             # 디버깅: violations 데이터 출력
-                            self.logger.info(f"    - [디버깅] violations 데이터: {first_violation}")
-                            self.logger.info(f"    - [디버깅] pre_duration: {pre_duration}, post_duration: {post_duration}")
-                            self.logger.info(f"    - [디버깅] total_duration: {total_duration}")
+                            self.logger.info("    - [디버깅] violations 데이터: %s", first_violation)
+                            self.logger.info("    - [디버깅] pre_duration: %s, post_duration: %s", pre_duration, post_duration)
+                            self.logger.info("    - [디버깅] total_duration: %s", total_duration)
                         else:
                             self.logger.info("    - [디버깅] violations가 비어있음")
                             total_duration = 3  # 기본값
@@ -94,74 +125,139 @@ class RuleEngine:
                         # 낙상 감지 규칙일 때는 무조건 5초 영상 생성
                         if result.get('rule_type') == 'fall_detection':
                             total_duration = 5.0
-                            self.logger.info(f"    - [낙상 감지] 강제로 5초 영상 생성 설정")
+                            self.logger.info("    - [낙상 감지] 강제로 5초 영상 생성 설정")
 
                         video_clip_path = create_alert_video_clip(
                             video_path,
-                            frame_data.get('frame_number', 0),
+                            frame_number,
                             alert_data['alertId'],
                             total_duration  # 동적으로 계산된 클립 길이
                         )
                         alert_data['video_clip_path'] = video_clip_path
 
                     alerts.append(alert_data)
+                    cooldown_key = None
 
-                    # 데이터베이스에 저장
-                    alert_id = await db.create_alert(alert_data)
-
-                    # SSE로 브로드캐스트
-                    asyncio.create_task(broker.send_alert(alert_data))
-
-                    # 규칙 실행 결과 저장
-                    await db.save_rule_execution(
-                        rule_id=rule_id,
-                        video_id=video_id,
-                        frame_number=frame_data.get('frame_number', 0),
-                        timestamp_ms=frame_data.get('timestamp_ms', 0),
-                        result=True,
-                        details=result
-                    )
+                    # 규칙 실행 결과 기록
+                    executions.append((rule_id, video_id, frame_number, timestamp_ms, True, result))
                 else:
-                    self.logger.info(f"    - 위반 없음")
-
-                    # 규칙 실행 결과 저장 (위반 없음)
-                    await db.save_rule_execution(
-                        rule_id=rule_id,
-                        video_id=video_id,
-                        frame_number=frame_data.get('frame_number', 0),
-                        timestamp_ms=frame_data.get('timestamp_ms', 0),
-                        result=False,
-                        details=None
-                    )
+                    self.logger.info("    - 위반 없음")
+
+                    # 규칙 실행 결과 기록 (위반 없음)
+                    executions.append((rule_id, video_id, frame_number, timestamp_ms, False, None))
             except Exception as e:
-                self.logger.error(f"    ✗ 규칙 평가 오류: {e}")
-
-                # 에러 발생 시에도 실행 결과 저장
-                await db.save_rule_execution(
-                    rule_id=rule_id,
-                    video_id=video_id,
-                    frame_number=frame_data.get('frame_number', 0),
-                    timestamp_ms=frame_data.get('timestamp_ms', 0),
-                    result=False,
-                    details={'error': str(e)}
-                )
+                self.logger.error("    ✗ 규칙 평가 오류: %s", e)
+
+                # 알림을 만들지 못했으면 쿨다운도 되돌려 다음 위반에서 다시 알림
+                if cooldown_key is not None:
+                    self._cooldown.pop(cooldown_key, None)
+
+                # 에러 발생 시에도 실행 결과 기록
+                executions.append((rule_id, video_id, frame_number, timestamp_ms, False, {'error': str(e)}))
+
+        # DB 저장은 백그라운드 쓰기 작업에 맡김 (규칙 평가가 DB 지연을 기다리지 않음)
+        self._ensure_writer()
+        for alert_data in alerts:
+            await self._write_queue.put(('alert', alert_data))
+        for execution in executions:
+            await self._write_queue.put(('execution', execution))
 
         if alerts:
-            self.logger.info(f"  - 총 {len(alerts)}개 알림 생성")
+            self.logger.info("  - 총 %d개 알림 생성", len(alerts))
         else:
-            self.logger.info(f"  - 알림 없음")
+            self.logger.info("  - 알림 없음")
 
         return alerts
 
+    def _acquire_cooldown(self, video_id: str, rule_type: str) -> bool:
+        """쿨다운이 지났으면 알림 시각을 기록하고 True, 쿨다운 중이면 False 반환
+
+        기록이 없거나 지난 기록은 같은 의미이므로, 알림 생성에 실패하면 키를 지워 되돌립니다.
+        """
+        now = time.monotonic()
+        key = (video_id, rule_type)
+
+        if now - self._cooldown.get(key, float('-inf')) < self.ALERT_COOLDOWN_SECONDS:
+            return False
+
+        # 오래된 쿨다운 기록 정리
+        if len(self._cooldown) >= self.MAX_COOLDOWN_ENTRIES:
+            self._cooldown = {k: ts for k, ts in self._cooldown.items() if now - ts < self.ALERT_COOLDOWN_SECONDS}
+
+        self._cooldown[key] = now
+        return True
+
+    def _ensure_writer(self):
+        """백그라운드 DB 쓰기 작업이 실행 중인지 확인하고, 없으면 시작"""
+        if self._writer_task is None or self._writer_task.done():
+            self._write_queue = asyncio.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+            self._writer_task = asyncio.create_task(self._db_writer_loop())
+
+    async def _db_writer_loop(self):
+        """쓰기 큐에서 레코드를 모아 알림/규칙 실행 결과를 일괄 저장
+
+        단일 작업이 큐 순서대로 저장하므로 video_id별 저장 순서가 유지됩니다.
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._write_queue.get()]
+
+            # 최대 WRITE_FLUSH_INTERVAL 동안 WRITE_BATCH_SIZE까지 모으기
+            deadline = loop.time() + self.WRITE_FLUSH_INTERVAL
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            alerts = [record for kind, record in batch if kind == 'alert']
+            executions = [record for kind, record in batch if kind == 'execution']
+
+            # 알림 저장이 실패해도 규칙 실행 결과는 저장되도록 각각 따로 처리
+            try:
+                if alerts:
+                    await db.create_alerts_bulk(alerts)
+
+                    # 저장된 알림만 SSE로 브로드캐스트
+                    for alert_data in alerts:
+                        task = asyncio.create_task(broker.send_alert(alert_data))
+                        self._sse_tasks.add(task)
+                        task.add_done_callback(self._sse_tasks.discard)
+            except Exception as e:
+                self.logger.error(f"알림 저장 오류 ({len(alerts)}건): {e}")
+
+            try:
+                if executions:
+                    await db.save_rule_executions_bulk(executions)
+            except Exception as e:
+                self.logger.error(f"규칙 실행 결과 저장 오류 ({len(executions)}건): {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    async def flush_writes(self):
+        """대기 중인 DB 쓰기가 모두 끝날 때까지 대기"""
+        if self._write_queue is not None and self._writer_task is not None and not self._writer_task.done():
+            await self._write_queue.join()
+
     def _create_alert(self, rule_result: Dict, frame_data: Dict, video_id: str) -> Dict:
         """규칙 평가 결과로부터 알림 데이터 생성"""
         alert_id = str(uuid.uuid4())
 
+        # 프레임 타임스탬프가 없을 때만 현재 시각(ms) 사용
+        ts_ms = frame_data.get('timestamp_ms')
+        if ts_ms is None:
+            ts_ms = time.time_ns() // 1_000_000
+
         return {
             'alertId': alert_id,
             'rule_id': rule_result['rule_id'],
             'rule_type': rule_result['rule_type'],
-            'ts_ms': frame_data.get('timestamp_ms', int(datetime.now().timestamp() * 1000)),
+            'ts_ms': ts_ms,
             'summary': rule_result['summary'],
             'detail': rule_result,
             'video_id': video_id,
@@ -172,16 +268,12 @@ class RuleEngine:
 
     def _get_rule_severity(self, rule_id: str) -> str:
         """규칙의 심각도 반환"""
-        for rule_data in cfg.get_rules():
-            if rule_data['id'] == rule_id:
-                return rule_data.get('severity', 'medium')
-        return 'medium'
+        return self._severity_by_id.get(rule_id, 'medium')
 
     def get_rule_info(self) -> List[Dict]:
         """현재 로드된 규칙 정보 반환"""
-        rule_info = []
-        for rule_id, rule in self.rules.items():
-            rule_info.append({
+        return [
+            {
                 'id': rule_id,
                 'type': rule.rule_data['type'],
                 'name': rule.rule_data['name'],
@@ -189,17 +281,20 @@ class RuleEngine:
                 'severity': rule.rule_data.get('severity', 'medium'),
                 'description': rule.rule_data.get('description', ''),
                 'params': rule.rule_data['params']
-            })
-        return rule_info
+            }
+            for rule_id, rule in self.rules.items()
+        ]
 
     def test_rule(self, rule_data: Dict, test_detections: List[Dict], test_frame_data: Dict) -> Dict:
         """규칙 테스트 (실제 비디오 없이)"""
         try:
+            from vision.detector import Detection
+
             # 테스트용 규칙 생성
             test_rule = create_rule(rule_data, cfg._config)
 
-            # 규칙 평가
-            result = test_rule.evaluate(test_detections, test_frame_data)
+            # 규칙 평가 (API 입력 dict를 Detection으로 변환)
+            result = test_rule.evaluate([Detection.from_dict(d) for d in test_detections], test_frame_data)
 
             return {
                 'success': True,
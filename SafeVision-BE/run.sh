@@ -20,4 +20,5 @@ echo "서버 주소: http://localhost:8000"
 echo "API 문서: http://localhost:8000/docs"
 echo "중지하려면 Ctrl+C를 누르세요."
 
-python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+# uvloop 이벤트 루프 명시 (app.main의 loop="uvloop"은 python -m app.main 실행 시에만 적용)
+python -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload --loop uvloop
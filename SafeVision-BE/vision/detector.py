@@ -1,126 +1,600 @@
+import asyncio
+import queue
+import threading
+from collections import Counter
 import cv2
 import numpy as np
+import torch
+from dataclasses import dataclass, field
 from ultralytics import YOLO
-from typing import Any, List, Dict, Tuple, Optional
+from ultralytics.models.yolo.detect import DetectionPredictor
+from typing import Any, Awaitable, Callable, Iterator, List, Dict, Tuple, Optional
 import logging
+from pathlib import Path
+from types import MappingProxyType
+from core.config import cfg
 from logging_config import get_logger
 
+# 라벨별 바운딩 박스 색상 (BGR) - 모듈 로드 시 한 번만 생성
+_LABEL_COLOR_MAP = MappingProxyType({
+    # 사람 관련
+    'person': (0, 255, 0),      # 녹색
+
+    # 차량 관련
+    'car': (255, 0, 0),         # 파란색
+    'truck': (255, 0, 0),       # 파란색
+    'bus': (255, 0, 0),         # 파란색
+    'motorcycle': (0, 0, 255),  # 빨간색
+    'bicycle': (0, 0, 255),     # 빨간색
+    'train': (255, 0, 0),       # 파란색
+
+    # 건설장비
+    'forklift': (255, 165, 0),  # 주황색
+    'crane': (128, 0, 128),     # 보라색
+    'excavator': (128, 0, 128), # 보라색
+    'bulldozer': (128, 0, 128), # 보라색
+    'loader': (128, 0, 128),    # 보라색
+    'dumper': (128, 0, 128),    # 보라색
+
+    # 동물
+    'dog': (0, 255, 255),       # 노란색
+    'cat': (0, 255, 255),       # 노란색
+    'horse': (0, 255, 255),     # 노란색
+
+    # 물체
+    'chair': (255, 255, 0),     # 청록색
+    'couch': (255, 255, 0),     # 청록색
+    'bed': (255, 255, 0),       # 청록색
+    'dining table': (255, 255, 0), # 청록색
+    'tv': (255, 255, 0),        # 청록색
+    'laptop': (255, 255, 0),    # 청록색
+    'cell phone': (255, 255, 0), # 청록색
+
+    # 음식
+    'pizza': (0, 255, 255),     # 노란색
+    'sandwich': (0, 255, 255),  # 노란색
+    'orange': (0, 255, 255),    # 노란색
+    'broccoli': (0, 255, 255),  # 노란색
+    'carrot': (0, 255, 255),    # 노란색
+
+    # 스포츠
+    'sports ball': (255, 0, 255), # 마젠타
+    'baseball bat': (255, 0, 255), # 마젠타
+    'baseball glove': (255, 0, 255), # 마젠타
+    'tennis racket': (255, 0, 255), # 마젠타
+
+    # 주방용품
+    'knife': (255, 255, 255),   # 흰색
+    'fork': (255, 255, 255),    # 흰색
+    'spoon': (255, 255, 255),   # 흰색
+    'bowl': (255, 255, 255),    # 흰색
+    'cup': (255, 255, 255),     # 흰색
+    'wine glass': (255, 255, 255), # 흰색
+    'bottle': (255, 255, 255),  # 흰색
+
+    # 옷
+    'backpack': (128, 128, 128), # 회색
+    'umbrella': (128, 128, 128), # 회색
+    'handbag': (128, 128, 128),  # 회색
+    'suitcase': (128, 128, 128), # 회색
+
+    # 신호등/표지판
+    'traffic light': (0, 128, 255), # 주황색
+    'fire hydrant': (0, 128, 255), # 주황색
+    'stop sign': (0, 128, 255),    # 주황색
+    'parking meter': (0, 128, 255), # 주황색
+    'bench': (0, 128, 255),        # 주황색
+})
+_DEFAULT_COLOR = (128, 128, 128)  # 기본값: 회색
+
+@dataclass(slots=True, frozen=True)
+class Detection:
+    """탐지 객체 하나 (dict 대신 slots 기반으로 메모리/속성 접근 비용 절감)"""
+    bbox: Tuple[int, int, int, int]
+    center_x: float
+    center_y: float
+    width: float
+    height: float
+    confidence: float
+    class_id: int
+    label: str
+    track_id: str
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Detection':
+        """dict 형식(API 입력 등)에서 생성"""
+        return cls(
+            bbox=tuple(data.get('bbox', (0, 0, 0, 0))),
+            center_x=data['center_x'],
+            center_y=data['center_y'],
+            width=data.get('width', 0.0),
+            height=data.get('height', 0.0),
+            confidence=data.get('confidence', 0.0),
+            class_id=data.get('class_id', -1),
+            label=data.get('label', ''),
+            track_id=data.get('track_id')
+        )
+
+    def to_dict(self) -> Dict:
+        """dict 형식으로 변환 (DB 저장/API 응답용)"""
+        return {
+            'bbox': list(self.bbox),
+            'center_x': self.center_x,
+            'center_y': self.center_y,
+            'width': self.width,
+            'height': self.height,
+            'confidence': self.confidence,
+            'class_id': self.class_id,
+            'label': self.label,
+            'track_id': self.track_id
+        }
+
+@dataclass
+class Detections:
+    """한 프레임의 탐지 결과 (필드별 병렬 NumPy 배열, SoA)"""
+    bbox: np.ndarray        # (N, 4) int32 - x1, y1, x2, y2
+    center: np.ndarray      # (N, 2) float32 - center_x, center_y
+    wh: np.ndarray          # (N, 2) float32 - width, height
+    conf: np.ndarray        # (N,) float32
+    class_id: np.ndarray    # (N,) int32
+    labels: List[str]
+    track_ids: List[str]
+    _objects: Optional[List[Detection]] = field(default=None, init=False, repr=False, compare=False)
+    _dicts: Optional[List[Dict]] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def empty(cls) -> 'Detections':
+        """탐지 결과 없음"""
+        return cls(
+            bbox=np.empty((0, 4), dtype=np.int32),
+            center=np.empty((0, 2), dtype=np.float32),
+            wh=np.empty((0, 2), dtype=np.float32),
+            conf=np.empty(0, dtype=np.float32),
+            class_id=np.empty(0, dtype=np.int32),
+            labels=[],
+            track_ids=[]
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def summary(self, top_k: int = 3) -> str:
+        """로그용 요약 (라벨별 개수, 평균 신뢰도, 신뢰도 상위 top_k개) - 객체별 변환 없이 배열에서 계산"""
+        if not len(self):
+            return "0개"
+
+        label_counts = ", ".join(f"{label} {count}" for label, count in Counter(self.labels).items())
+        top = np.argsort(self.conf)[::-1][:top_k].tolist()
+        top_text = ", ".join(f"{self.track_ids[i]} {self.conf[i]:.2f}" for i in top)
+        return f"{len(self)}개 ({label_counts}), 평균 conf={float(self.conf.mean()):.2f}, 상위: {top_text}"
+
+    def as_objects(self) -> List[Detection]:
+        """객체별 Detection 리스트로 변환 (규칙 평가용, 결과는 캐시)"""
+        if self._objects is None:
+            self._objects = [
+                Detection(tuple(bbox), center_x, center_y, width, height, confidence, class_id, label, track_id)
+                for bbox, (center_x, center_y), (width, height), confidence, class_id, label, track_id in zip(
+                    self.bbox.tolist(), self.center.tolist(), self.wh.tolist(),
+                    self.conf.tolist(), self.class_id.tolist(), self.labels, self.track_ids
+                )
+            ]
+        return self._objects
+
+    def as_dicts(self) -> List[Dict]:
+        """객체별 dict 리스트로 변환 (DB 저장 등 외부 경계용, 결과는 캐시)"""
+        if self._dicts is None:
+            self._dicts = [
+                {
+                    'bbox': bbox,
+                    'center_x': center_x,
+                    'center_y': center_y,
+                    'width': width,
+                    'height': height,
+                    'confidence': confidence,
+                    'class_id': class_id,
+                    'label': label,
+                    'track_id': track_id
+                }
+                for bbox, (center_x, center_y), (width, height), confidence, class_id, label, track_id in zip(
+                    self.bbox.tolist(), self.center.tolist(), self.wh.tolist(),
+                    self.conf.tolist(), self.class_id.tolist(), self.labels, self.track_ids
+                )
+            ]
+        return self._dicts
+
+@torch.jit.script
+def _preprocess_batch(batch: torch.Tensor, height: int, width: int, pad_h: int, pad_w: int) -> torch.Tensor:
+    """GPU의 uint8 BHWC(BGR) 배치를 모델 입력(float BCHW, RGB, 0~1)으로 변환
+
+    비율을 유지해 (height, width)로 리사이즈한 뒤, 좌표 보정이 필요 없도록 오른쪽/아래에만 패딩합니다.
+    """
+    x = batch.permute(0, 3, 1, 2).flip([1]).float().mul_(1.0 / 255.0)
+    x = torch.nn.functional.interpolate(x, size=[height, width], mode='bilinear', align_corners=False)
+    return torch.nn.functional.pad(x, [0, pad_w, 0, pad_h], value=114.0 / 255.0)
+
+class _TensorInputPredictor(DetectionPredictor):
+    """GPU 전처리된 텐서 입력에서 원본 이미지를 호스트로 되돌리지 않는 YOLO predictor
+
+    텐서 입력이면 Ultralytics는 Results.orig_img를 만들려고 배치 전체를 numpy로 복사(GPU -> 호스트)하지만,
+    박스 좌표는 감지기가 원본 기준으로 직접 복원하므로 모델 입력 크기의 자리표시 배열(메모리 복사 없음)로 대신합니다.
+    (모델 입력 크기를 그대로 넘기므로 Ultralytics의 박스 좌표 변환은 그대로 유지됨)
+    """
+
+    def postprocess(self, preds, img, orig_imgs, **kwargs):
+        if isinstance(orig_imgs, torch.Tensor):
+            placeholder = np.broadcast_to(np.zeros((), dtype=np.uint8), tuple(img.shape[2:]) + (3,))
+            orig_imgs = [placeholder] * len(orig_imgs)
+        return super().postprocess(preds, img, orig_imgs, **kwargs)
+
+class FrameDecoder:
+    """샘플 프레임을 백그라운드 스레드에서 미리 디코딩하여 크기 제한 큐에 채우는 생산자
+
+    디코딩(CPU)과 객체 감지(GPU)가 겹쳐 실행되도록, 감지 쪽은 next_batch()로 배치 단위로 꺼내 갑니다.
+    큐가 가득 차면 디코딩 스레드가 대기하므로 디코딩된 프레임이 메모리에 쌓이지 않습니다.
+    """
+
+    _END = object()  # 종료 신호
+
+    def __init__(self, frames: Iterator[Tuple[int, np.ndarray, int]], maxsize: int = 32):
+        self._frames = frames
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._done = False
+        self._thread = threading.Thread(target=self._run, name='frame-decoder', daemon=True)
+
+    def start(self) -> 'FrameDecoder':
+        self._thread.start()
+        return self
+
+    def _put(self, item) -> bool:
+        """중단 요청이 올 때까지 큐에 넣기를 재시도 (넣었으면 True)"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for sampled in self._frames:
+                if not self._put(sampled):
+                    return
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(self._END)
+
+    def next_batch(self, batch_size: int) -> List[Tuple[int, np.ndarray, int]]:
+        """최대 batch_size개의 (frame_count, frame, timestamp_ms)를 꺼냄 (끝나면 빈 리스트)"""
+        batch = []
+        while len(batch) < batch_size and not self._done:
+            item = self._queue.get()
+            if item is self._END:
+                self._done = True
+                break
+            batch.append(item)
+
+        # 디코딩 중 오류는 이미 꺼낸 프레임을 모두 넘겨준 뒤 전달
+        if not batch and self._error is not None:
+            raise self._error
+        return batch
+
+    def close(self):
+        """디코딩 스레드를 중단하고 종료될 때까지 대기
+
+        중단된 디코딩 스레드는 종료 신호를 넣지 못하므로, 큐를 비운 뒤 직접 넣어
+        next_batch()에서 대기 중인 스레드도 깨웁니다.
+        """
+        self._stop.set()
+        self._thread.join()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put_nowait(self._END)
+
 class YOLODetector:
     """YOLO 모델을 사용한 객체 감지 클래스"""
 
-    def __init__(self, model_path: str = "yolov8n.pt", confidence_threshold: float = 0.5):
-        self.model = YOLO(model_path)
-        self.confidence_threshold = confidence_threshold
+    # 한 번의 추론에 묶을 최대 프레임 수 (이보다 크면 처리량 이득이 거의 없고 메모리만 늘어남)
+    MAX_BATCH_SIZE = 16
+    # GPU 전처리 시 모델 입력 크기 (긴 변 기준) 및 패딩 배수
+    IMGSZ = 640
+    STRIDE = 32
+
+    def __init__(self, model_path: str = "yolov8n.pt", confidence_threshold: float = 0.5,
+                 int8: bool = False, calib_data: str = "coco8.yaml",
+                 fp16_engine: bool = False, engine_path: Optional[str] = None,
+                 gpu_preprocess: bool = True, inference_dtype: str = "fp16", device: Optional[str] = None,
+                 torch_compile: bool = False):
         self.logger = get_logger('yolo_detector')
-        self.logger.info(f"YOLO 모델 로드 완료: {model_path}")
+        self.confidence_threshold = confidence_threshold
+        self._draw_buf: Optional[np.ndarray] = None  # draw_detections 결과 버퍼 (재사용)
+
+        # TensorRT 엔진(FP16/INT8)은 CUDA 환경에서만 사용 (CPU 환경은 기존 모델 그대로)
+        cuda = torch.cuda.is_available()
+        # 추론 장치 (None이면 자동 선택, 멀티 GPU에서는 'cuda:N'으로 GPU마다 감지기 생성)
+        self.device = device
+        self._cuda_device = torch.device(device if device else 'cuda') if cuda else None
+        self.int8 = int8 and cuda
+        self.trt = (self.int8 or fp16_engine) and cuda
+        if self.trt:
+            try:
+                model_path = self._get_trt_engine(model_path, self.int8, calib_data, engine_path)
+            except Exception as e:
+                # 엔진 생성에 실패하면 PyTorch 모델로 추론
+                self.logger.warning(f"TensorRT 엔진 준비 실패, PyTorch 모델 사용: {e}")
+                self.int8 = self.trt = False
+
+        self.model = YOLO(model_path)
+        # CUDA에서는 FP16(half) 또는 BF16(autocast)으로 추론 (메모리 대역폭 절반, 텐서 코어 활용)
+        # TensorRT 엔진은 정밀도가 엔진에 고정되어 있으므로 PyTorch 모델에만 적용
+        self.inference_dtype = self._resolve_inference_dtype(inference_dtype) if cuda and not self.trt else 'fp32'
+        self.half = self.inference_dtype == 'fp16'
+        if cuda:
+            # FP32로 남는 matmul/conv도 TF32 텐서 코어 사용
+            torch.set_float32_matmul_precision('high')
+        # CUDA에서는 원본 uint8 프레임을 GPU로 올려 리사이즈/정규화 (CPU 전처리 및 float 전송 제거)
+        self.gpu_preprocess = gpu_preprocess and cuda
+        # 입력 크기가 고정된 GPU 전처리 경로에서만 torch.compile 사용 (첫 배치 추론 후 적용)
+        self.torch_compile = torch_compile and self.gpu_preprocess and not self.trt
+        self._compiled_batch = 0  # 컴파일 시점의 배치 크기 (작은 마지막 배치는 이 크기로 채워 재컴파일 방지)
+        # 여러 워커가 감지기를 공유하면 executor 스레드에서 동시에 호출되므로,
+        # YOLO predictor와 컴파일 상태를 쓰는 감지 호출은 한 번에 하나씩만 수행
+        self._infer_lock = threading.Lock()
+        self.logger.info(f"YOLO 모델 로드 완료: {model_path} (정밀도: {self.inference_dtype}, TensorRT: {self.trt}, "
+                         f"INT8: {self.int8}, GPU 전처리: {self.gpu_preprocess})")
         self.logger.info(f"신뢰도 임계값: {confidence_threshold}")
 
+    def _resolve_inference_dtype(self, inference_dtype: str) -> str:
+        """설정된 추론 정밀도 확인 (fp16/bf16/fp32, 지원하지 않으면 fp16)"""
+        if inference_dtype not in ('fp16', 'bf16', 'fp32'):
+            self.logger.warning(f"알 수 없는 추론 정밀도 '{inference_dtype}', fp16 사용")
+            return 'fp16'
+        if inference_dtype == 'bf16' and not torch.cuda.is_bf16_supported():
+            self.logger.warning("GPU가 BF16을 지원하지 않아 fp16 사용")
+            return 'fp16'
+        return inference_dtype
+
+    def _infer(self, inputs):
+        """설정된 정밀도로 YOLO 추론
+
+        신뢰도 임계값을 NMS 전에 적용하여 NMS 대상/결과 박스 수를 줄입니다.
+        (NMS 결과는 신뢰도 내림차순이므로 남는 박스와 그 인덱스는 후처리에서 거르는 경우와 동일)
+        """
+        if self.inference_dtype == 'bf16':
+            with torch.autocast('cuda', dtype=torch.bfloat16):
+                results = self.model(inputs, predictor=_TensorInputPredictor, verbose=False,
+                                     conf=self.confidence_threshold, device=self.device)
+        else:
+            results = self.model(inputs, predictor=_TensorInputPredictor, verbose=False, half=self.half,
+                                 conf=self.confidence_threshold, device=self.device)
+
+        if self.torch_compile and not self._compiled_batch and isinstance(inputs, torch.Tensor):
+            self._compile_model(len(inputs))
+        return results
+
+    def _compile_model(self, batch_size: int):
+        """첫 추론으로 준비된 predictor의 PyTorch 모델을 고정 입력 크기로 컴파일 (커널 융합/자동 튜닝)"""
+        predictor = getattr(self.model, 'predictor', None)
+        if predictor is None:
+            return
+
+        try:
+            predictor.model.model = torch.compile(predictor.model.model, mode='reduce-overhead', dynamic=False)
+            self._compiled_batch = batch_size
+            self.logger.info(f"torch.compile 적용 (배치 크기: {batch_size})")
+        except Exception as e:
+            self.logger.warning(f"torch.compile 실패, 컴파일 없이 추론: {e}")
+            self.torch_compile = False
+
+    def _get_trt_engine(self, model_path: str, int8: bool, calib_data: str, engine_path: Optional[str] = None) -> str:
+        """TensorRT 엔진 경로 반환 (없으면 한 번만 export)
+
+        FP16 엔진은 그대로, INT8 엔진은 calib_data로 보정하여 생성합니다.
+        배치 감지를 위해 MAX_BATCH_SIZE까지의 동적 배치 크기로 빌드합니다.
+        """
+        precision = 'int8' if int8 else 'fp16'
+        path = Path(engine_path) if engine_path else Path(model_path).with_name(f"{Path(model_path).stem}_{precision}.engine")
+        if not path.exists():
+            self.logger.info(f"{precision.upper()} TensorRT 엔진 생성 중: {path}")
+            export_args = {'format': 'engine', 'dynamic': True, 'batch': self.MAX_BATCH_SIZE}
+            if int8:
+                export_args.update(int8=True, data=calib_data)
+            else:
+                export_args.update(half=True)
+            Path(YOLO(model_path).export(**export_args)).replace(path)
+        return str(path)
+
     def update_confidence_threshold(self, threshold: float):
         """신뢰도 임계값 업데이트"""
         old_threshold = self.confidence_threshold
         self.confidence_threshold = threshold
         self.logger.info(f"신뢰도 임계값 변경: {old_threshold} -> {threshold}")
 
-    def detect_frame(self, frame: np.ndarray) -> List[Dict]:
+    def detect_frame(self, frame: np.ndarray) -> Detections:
         """단일 프레임에서 객체 감지"""
         try:
-            # YOLO 모델로 객체 감지
-            results = self.model(frame, verbose=False)
-
-            detections = []
-
-            for result in results:
-                if result.boxes is not None:
-                    boxes = result.boxes
-                    for i, box in enumerate(boxes):
-                        # 바운딩 박스 좌표
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-
-                        # 신뢰도
-                        confidence = float(box.conf[0].cpu().numpy())
-
-                        # 신뢰도가 너무 낮으면 건너뛰기
-                        if confidence < self.confidence_threshold:
-                            continue
-
-                        # 클래스 ID 및 라벨
-                        class_id = int(box.cls[0].cpu().numpy())
-                        label = self.model.names[class_id]
-
-                        # 중심점 계산
-                        center_x = (x1 + x2) / 2
-                        center_y = (y1 + y2) / 2
-
-                        # 너비와 높이
-                        width = x2 - x1
-                        height = y2 - y1
-
-                        # 너무 큰 객체는 제외 (화면 전체를 덮는 경우)
-                        frame_height, frame_width = frame.shape[:2]
-                        if width > frame_width * 0.8 or height > frame_height * 0.8:
-                            continue
-
-                        # 너무 작은 객체도 제외 (노이즈 방지)
-                        if width < 20 or height < 20:
-                            continue
-
-                        # 트래킹 ID (기본값)
-                        track_id = f"{label}_{i}"
-
-                        detection = {
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'center_x': float(center_x),
-                            'center_y': float(center_y),
-                            'width': float(width),
-                            'height': float(height),
-                            'confidence': confidence,
-                            'class_id': class_id,
-                            'label': label,
-                            'track_id': track_id
-                        }
-
-                        detections.append(detection)
-
-            # 프레임별 상세 로깅
-            frame_info = f"프레임 {frame.shape[1]}x{frame.shape[0]}"
-            if detections:
-                self.logger.info(f"[{frame_info}] YOLO 감지 완료: {len(detections)}개 객체")
-                for det in detections:
-                    self.logger.info(
-                        f"[{frame_info}] 객체: {det['label']} "
-                        f"(ID: {det['track_id']}, conf: {det['confidence']:.3f}, "
-                        f"size: {det['width']:.0f}x{det['height']:.0f}, "
-                        f"pos: ({det['center_x']:.0f}, {det['center_y']:.0f}))"
-                    )
-            else:
-                self.logger.info(f"[{frame_info}] YOLO 감지 결과: 객체 없음")
-
-            # 신뢰도 필터링 전 원본 결과도 로깅
-            if hasattr(result, 'boxes') and result.boxes is not None:
-                self.logger.info(f"[{frame_info}] 신뢰도 필터링 전 원본 감지:")
-                for i, box in enumerate(result.boxes):
-                    class_id = int(box.cls[0].cpu().numpy())
-                    confidence = float(box.conf[0].cpu().numpy())
-                    label = self.model.names[class_id]
-                    filter_status = "통과" if confidence >= self.confidence_threshold else "제외"
-                    self.logger.info(
-                        f"[{frame_info}] 원본 {label}: conf={confidence:.3f} "
-                        f"(필터링: {filter_status})"
-                    )
-
-            return detections
+            # YOLO 모델로 객체 감지 (이미지 1장 -> 결과 1개)
+            with self._infer_lock:
+                results = self._infer(frame)
+                return self._postprocess_result(results[0], frame)
 
         except Exception as e:
             self.logger.error(f"객체 감지 실패: {e}")
+            return Detections.empty()
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Detections]:
+        """여러 프레임을 한 번의 YOLO 호출로 배치 감지 (프레임 순서대로 결과 반환)"""
+        if not frames:
             return []
 
-    def detect_video_frames(self, video_path: str, sample_fps: int = 5) -> List[Tuple[int, np.ndarray, List[Dict]]]:
-        """비디오에서 프레임을 샘플링하여 객체 감지"""
+        try:
+            with self._infer_lock:
+                if self.gpu_preprocess:
+                    batch_input, scale = self._preprocess_gpu(frames)
+                    if len(frames) < self._compiled_batch:
+                        # 컴파일된 모델은 입력 크기가 같아야 재컴파일되지 않으므로 빈 프레임으로 채움 (결과는 zip에서 버려짐)
+                        padding = batch_input.new_zeros((self._compiled_batch - len(frames),) + tuple(batch_input.shape[1:]))
+                        batch_input = torch.cat([batch_input, padding])
+                else:
+                    # 전처리(letterbox/정규화)와 배치 텐서 구성은 YOLO가 리스트 입력을 받아 한 번에 수행
+                    batch_input, scale = frames, 1.0
+
+                batch_results = self._infer(batch_input)
+                return [self._postprocess_result(result, frame, scale) for frame, result in zip(frames, batch_results)]
+
+        except Exception as e:
+            self.logger.error(f"배치 객체 감지 실패 ({len(frames)} 프레임): {e}")
+            return [Detections.empty() for _ in frames]
+
+    def _preprocess_gpu(self, frames: List[np.ndarray]) -> Tuple[torch.Tensor, float]:
+        """같은 크기의 프레임들을 uint8 그대로 GPU로 올려 한 번에 전처리
+
+        반환: (모델 입력 텐서, 원본 대비 축소 비율) - 박스 좌표는 비율로 나눠 원본 좌표로 복원
+        """
+        frame_height, frame_width = frames[0].shape[:2]
+        scale = min(self.IMGSZ / frame_height, self.IMGSZ / frame_width)
+        height, width = round(frame_height * scale), round(frame_width * scale)
+
+        batch = torch.from_numpy(np.stack(frames)).to(self._cuda_device, non_blocking=True)
+        return _preprocess_batch(batch, height, width, -height % self.STRIDE, -width % self.STRIDE), scale
+
+    def _detect_pending(self, pending: List[Tuple[int, np.ndarray, int]]) -> List[Tuple[int, Detections, int]]:
+        """모아둔 (frame_count, frame, timestamp_ms)들을 배치 감지하여 (frame_count, detections, timestamp_ms)로 나눔
+
+        프레임 배열은 감지 후 바로 놓아주도록 결과에 포함하지 않습니다.
+        """
+        batch_detections = self.detect_batch([frame for _, frame, _ in pending])
+        return [
+            (frame_count, detections, timestamp_ms)
+            for (frame_count, _, timestamp_ms), detections in zip(pending, batch_detections)
+        ]
+
+    def _clamp_batch_size(self, batch_size: int) -> int:
+        """배치 크기를 1 ~ MAX_BATCH_SIZE 범위로 제한"""
+        return max(1, min(int(batch_size), self.MAX_BATCH_SIZE))
+
+    def _postprocess_result(self, result, frame: np.ndarray, scale: float = 1.0) -> Detections:
+        """YOLO 결과 하나(이미지 1장)를 Detections(SoA)로 변환
+
+        scale: 모델 입력이 원본 대비 축소된 비율 (GPU 전처리 시 박스 좌표를 원본 기준으로 복원)
+        """
+        raw = None  # 크기 필터링 전 NMS 결과 (cls, conf) 배열 - 디버그 로깅용
+
+        # 프레임 크기와 최대 객체 크기(화면의 80%)는 프레임당 한 번만 계산
+        frame_height, frame_width = frame.shape[:2]
+        max_width = frame_width * 0.8
+        max_height = frame_height * 0.8
+
+        if result.boxes is None or not len(result.boxes):
+            detections = Detections.empty()
+        else:
+            boxes = result.boxes
+
+            # 박스 좌표/신뢰도/클래스가 담긴 (N, 6) 텐서를 한 번의 복사로 호스트로 가져옴
+            data = boxes.data.float().cpu().numpy()  # BF16 추론 결과도 float32로
+            xyxy = data[:, :4]
+            if scale != 1.0:
+                xyxy = xyxy / scale
+            conf = data[:, 4]
+            cls = data[:, 5].astype(np.int32)
+
+            # 너비/높이 및 중심점 계산
+            width = xyxy[:, 2] - xyxy[:, 0]
+            height = xyxy[:, 3] - xyxy[:, 1]
+            center_x = (xyxy[:, 0] + xyxy[:, 2]) * 0.5
+            center_y = (xyxy[:, 1] + xyxy[:, 3]) * 0.5
+
+            # 신뢰도가 낮거나, 너무 크거나(화면 전체를 덮는 경우), 너무 작은(노이즈) 객체 제외
+            keep = ((conf >= self.confidence_threshold)
+                    & (width <= max_width) & (height <= max_height)
+                    & (width >= 20) & (height >= 20))
+            kept = np.flatnonzero(keep)
+            raw = (cls, conf)
+
+            names = self.model.names
+            labels = [names[class_id] for class_id in cls[kept].tolist()]
+
+            detections = Detections(
+                bbox=xyxy[kept].astype(np.int32),
+                center=np.column_stack([center_x[kept], center_y[kept]]).astype(np.float32),
+                wh=np.column_stack([width[kept], height[kept]]).astype(np.float32),
+                conf=conf[kept].astype(np.float32),
+                class_id=cls[kept],
+                labels=labels,
+                # 트래킹 ID (기본값: 원본 박스 인덱스)
+                track_ids=[f"{label}_{i}" for label, i in zip(labels, kept.tolist())]
+            )
+
+        # 프레임별 상세 로깅 (해당 레벨이 꺼져 있으면 문자열을 만들지 않음)
+        if self.logger.isEnabledFor(logging.INFO):
+            if len(detections):
+                self.logger.info("[프레임 %dx%d] YOLO 감지 완료: %d개 객체", frame_width, frame_height, len(detections))
+                for label, track_id, confidence, (width, height), (center_x, center_y) in zip(
+                        detections.labels, detections.track_ids, detections.conf.tolist(),
+                        detections.wh.tolist(), detections.center.tolist()):
+                    self.logger.info(
+                        "[프레임 %dx%d] 객체: %s (ID: %s, conf: %.3f, size: %.0fx%.0f, pos: (%.0f, %.0f))",
+                        frame_width, frame_height, label, track_id, confidence, width, height, center_x, center_y
+                    )
+            else:
+                self.logger.info("[프레임 %dx%d] YOLO 감지 결과: 객체 없음", frame_width, frame_height)
+
+        # 크기 필터링 전 NMS 결과도 로깅 (DEBUG에서만, 이미 복사한 배열 재사용)
+        # 신뢰도 임계값은 NMS 전에 적용되므로 여기에는 임계값 이상인 박스만 있음
+        if raw is not None and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[프레임 %dx%d] 크기 필터링 전 NMS 결과:", frame_width, frame_height)
+            for class_id, confidence in zip(raw[0].tolist(), raw[1].tolist()):
+                self.logger.debug("[프레임 %dx%d] 원본 %s: conf=%.3f",
+                                  frame_width, frame_height, self.model.names[class_id], confidence)
+
+        return detections
+
+    async def stream_video_frames_async(self, video_path: str,
+                                        sink: Callable[[Tuple[int, Detections, int]], Awaitable[Any]],
+                                        sample_fps: int = 5, batch_size: int = 16, queue_size: int = 32) -> int:
+        """비디오 디코딩과 객체 감지를 겹쳐 실행하는 비동기 파이프라인
+
+        디코딩은 전용 스레드(FrameDecoder)가 크기 제한 큐를 채우고, 감지는 배치 단위로 꺼내
+        스레드 풀에서 실행하므로 이벤트 루프를 막지 않습니다.
+        감지 결과는 프레임 순서대로 sink에 전달하며, 처리한 프레임 수를 반환합니다(열기 실패 시 0).
+        """
+        cap, fps = self._open_video(video_path, sample_fps)
+        if cap is None:
+            return 0
+
+        batch_size = self._clamp_batch_size(batch_size)
+        loop = asyncio.get_running_loop()
+        decoder = FrameDecoder(self._iter_sampled_frames(cap, fps, sample_fps), maxsize=queue_size).start()
+        frame_total = 0
+
+        def take_and_detect():
+            # 배치 꺼내기와 감지를 한 번의 스레드 풀 호출로 처리
+            return self._detect_pending(batch) if (batch := decoder.next_batch(batch_size)) else []
+
+        try:
+            while results := await loop.run_in_executor(None, take_and_detect):
+                for result in results:
+                    await sink(result)
+                frame_total += len(results)
+        finally:
+            await loop.run_in_executor(None, decoder.close)
+            cap.release()
+
+        return frame_total
+
+    def _open_video(self, video_path: str, sample_fps: int) -> Tuple[Optional[Any], float]:
+        """비디오 파일을 열고 정보를 출력 (실패 시 (None, 0))"""
         cap = cv2.VideoCapture(video_path)
 
         if not cap.isOpened():
             print(f"비디오 파일을 열 수 없습니다: {video_path}")
-            return []
+            return None, 0
 
         # 비디오 정보
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -128,48 +602,71 @@ class YOLODetector:
         duration = total_frames / fps
 
         print(f"비디오 정보: {total_frames} 프레임, {fps:.2f} FPS, {duration:.2f}초")
-        print(f"샘플링: {sample_fps} FPS로 {int(duration * sample_fps)} 프레임 분석")
+        print(f"샘플링: {sample_fps} FPS로 {self._sampled_frame_count(total_frames, fps, sample_fps)} 프레임 분석")
+
+        return cap, fps
 
+    def count_sampled_frames(self, video_path: str, sample_fps: int) -> int:
+        """디코딩 없이 메타데이터로 분석할(샘플링될) 프레임 수를 계산 (진행률 표시용, 실패 시 0)"""
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                return 0
+            return self._sampled_frame_count(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS), sample_fps)
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _sampled_frame_count(total_frames: int, fps: float, sample_fps: int) -> int:
+        """_iter_sampled_frames가 생성할 프레임 수"""
         frame_interval = max(1, int(fps / sample_fps))
-        results = []
-        frame_count = 0
+        return -(-total_frames // frame_interval)
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
+    def _iter_sampled_frames(self, cap, fps: float, sample_fps: int) -> Iterator[Tuple[int, np.ndarray, int]]:
+        """샘플링 간격에 해당하는 프레임만 디코딩하여 (frame_count, frame, timestamp_ms) 생성
+
+        건너뛰는 프레임은 grab()으로 스트림만 진행하고, 샘플 프레임만 retrieve()로
+        BGR 이미지 변환을 수행합니다.
+        """
+        frame_interval = max(1, int(fps / sample_fps))
+        frame_count = 0
 
+        while cap.grab():
             # 지정된 간격으로 프레임 샘플링
             if frame_count % frame_interval == 0:
-                # 객체 감지
-                detections = self.detect_frame(frame)
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
 
-                # 결과 저장
                 timestamp_ms = int((frame_count / fps) * 1000)
-                results.append((frame_count, frame, detections, timestamp_ms))
+                yield frame_count, frame, timestamp_ms
             frame_count += 1
 
-        cap.release()
-        return results
-
-    def draw_detections(self, frame: np.ndarray, detections: List[Dict],
+    def draw_detections(self, frame: np.ndarray, detections: List[Detection],
                        draw_labels: bool = True, draw_confidence: bool = True) -> np.ndarray:
-        """감지된 객체들을 프레임에 그리기"""
-        result_frame = frame.copy()
+        """감지된 객체들을 프레임에 그리기
+
+        반환되는 배열은 다음 호출에서 재사용되므로, 보관하려면 호출 측에서 복사해야 합니다.
+        """
+        # 프레임마다 새 버퍼를 할당하지 않고 같은 크기의 버퍼를 재사용
+        if self._draw_buf is None or self._draw_buf.shape != frame.shape or self._draw_buf.dtype != frame.dtype:
+            self._draw_buf = np.empty_like(frame)
+        np.copyto(self._draw_buf, frame)
+        result_frame = self._draw_buf
 
         for detection in detections:
-            bbox = detection['bbox']
+            bbox = detection.bbox
             x1, y1, x2, y2 = bbox
 
             # 바운딩 박스 그리기
-            color = self._get_color_by_label(detection['label'])
+            color = self._get_color_by_label(detection.label)
             cv2.rectangle(result_frame, (x1, y1), (x2, y2), color, 2)
 
             # 라벨과 신뢰도 그리기
             if draw_labels or draw_confidence:
-                label_text = detection['label']
+                label_text = detection.label
                 if draw_confidence:
-                    label_text += f" {detection['confidence']:.2f}"
+                    label_text += f" {detection.confidence:.2f}"
 
                 # 텍스트 배경
                 (text_width, text_height), _ = cv2.getTextSize(label_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
@@ -183,77 +680,7 @@ class YOLODetector:
 
     def _get_color_by_label(self, label: str) -> Tuple[int, int, int]:
         """라벨에 따른 색상 반환"""
-        color_map = {
-            # 사람 관련
-            'person': (0, 255, 0),      # 녹색
-
-            # 차량 관련
-            'car': (255, 0, 0),         # 파란색
-            'truck': (255, 0, 0),       # 파란색
-            'bus': (255, 0, 0),         # 파란색
-            'motorcycle': (0, 0, 255),  # 빨간색
-            'bicycle': (0, 0, 255),     # 빨간색
-            'train': (255, 0, 0),       # 파란색
-
-            # 건설장비
-            'forklift': (255, 165, 0),  # 주황색
-            'crane': (128, 0, 128),     # 보라색
-            'excavator': (128, 0, 128), # 보라색
-            'bulldozer': (128, 0, 128), # 보라색
-            'loader': (128, 0, 128),    # 보라색
-            'dumper': (128, 0, 128),    # 보라색
-
-            # 동물
-            'dog': (0, 255, 255),       # 노란색
-            'cat': (0, 255, 255),       # 노란색
-            'horse': (0, 255, 255),     # 노란색
-
-            # 물체
-            'chair': (255, 255, 0),     # 청록색
-            'couch': (255, 255, 0),     # 청록색
-            'bed': (255, 255, 0),       # 청록색
-            'dining table': (255, 255, 0), # 청록색
-            'tv': (255, 255, 0),        # 청록색
-            'laptop': (255, 255, 0),    # 청록색
-            'cell phone': (255, 255, 0), # 청록색
-
-            # 음식
-            'pizza': (0, 255, 255),     # 노란색
-            'sandwich': (0, 255, 255),  # 노란색
-            'orange': (0, 255, 255),    # 노란색
-            'broccoli': (0, 255, 255),  # 노란색
-            'carrot': (0, 255, 255),    # 노란색
-
-            # 스포츠
-            'sports ball': (255, 0, 255), # 마젠타
-            'baseball bat': (255, 0, 255), # 마젠타
-            'baseball glove': (255, 0, 255), # 마젠타
-            'tennis racket': (255, 0, 255), # 마젠타
-
-            # 주방용품
-            'knife': (255, 255, 255),   # 흰색
-            'fork': (255, 255, 255),    # 흰색
-            'spoon': (255, 255, 255),   # 흰색
-            'bowl': (255, 255, 255),    # 흰색
-            'cup': (255, 255, 255),     # 흰색
-            'wine glass': (255, 255, 255), # 흰색
-            'bottle': (255, 255, 255),  # 흰색
-
-            # 옷
-            'backpack': (128, 128, 128), # 회색
-            'umbrella': (128, 128, 128), # 회색
-            'handbag': (128, 128, 128),  # 회색
-            'suitcase': (128, 128, 128), # 회색
-
-            # 신호등/표지판
-            'traffic light': (0, 128, 255), # 주황색
-            'fire hydrant': (0, 128, 255), # 주황색
-            'stop sign': (0, 128, 255),    # 주황색
-            'parking meter': (0, 128, 255), # 주황색
-            'bench': (0, 128, 255),        # 주황색
-        }
-
-        return color_map.get(label, (128, 128, 128))  # 기본값: 회색
+        return _LABEL_COLOR_MAP.get(label, _DEFAULT_COLOR)
 
     def get_model_info(self) -> Dict[str, Any]:
         """모델 정보 반환"""
@@ -266,5 +693,18 @@ class YOLODetector:
             'available_classes': list(self.model.names.values()) if hasattr(self.model, 'names') else []
         }
 
+def create_detector(device: Optional[str] = None) -> YOLODetector:
+    """설정값으로 감지기 생성 (device를 지정하면 해당 GPU 전용)"""
+    return YOLODetector(
+        int8=cfg.get('int8_engine', False),
+        calib_data=cfg.get('int8_calib_data', 'coco8.yaml'),
+        fp16_engine=cfg.get('trt_engine', False),
+        engine_path=cfg.get('trt_engine_path'),
+        gpu_preprocess=cfg.get('gpu_preprocess', True),
+        inference_dtype=cfg.get('inference_dtype', 'fp16'),
+        device=device,
+        torch_compile=cfg.get('torch_compile', False)
+    )
+
 # 전역 감지기 인스턴스
-detector = YOLODetector()
+detector = create_detector()
@@ -1,23 +1,47 @@
-import os
-import threading
-import time
 import asyncio
-from typing import Dict, List, Any
-from vision.detector import detector
-from rules.engine import rule_engine
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+import torch
+from vision.detector import Detections, YOLODetector, create_detector, detector
+from rules.engine import RuleEngine, rule_engine
 from core.db import db
 from core.config import cfg
 from logging_config import get_logger
 
+# DB 저장용 변환 등 CPU 작업을 이벤트 루프 밖에서 처리하는 스레드 풀
+_FORMAT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='analysis-format')
+
+def _build_analysis_rows(pending: List[Tuple[int, int, Detections]]) -> List[Tuple[int, int, List[Dict]]]:
+    """(frame_number, timestamp_ms, detections) 목록을 save_video_analysis_batch용 행으로 변환"""
+    return [(frame_number, timestamp_ms, detections.as_dicts()) for frame_number, timestamp_ms, detections in pending]
+
 class VideoProcessor:
     """비디오 처리 워커 클래스"""
 
-    def __init__(self):
-        self.processing_queue = []
-        self.is_processing = False
+    # 파이프라인 단계 사이 큐 크기 (뒷단이 밀릴 때 앞단을 멈추는 backpressure)
+    PIPELINE_QUEUE_SIZE = 32
+    # 비디오 분석 결과를 한 번에 저장할 프레임 수
+    DB_BATCH_SIZE = 64
+    # 탐지가 없는 프레임도 이 간격(프레임 수)마다 한 번은 저장 (진행 기록)
+    HEARTBEAT_FRAMES = 100
+    # 전체 프레임 수를 모를 때의 진행 상황 요약 로그 간격 (프레임 수)
+    LOG_INTERVAL_FRAMES = 50
+
+    def __init__(self, video_detector: Optional[YOLODetector] = None, engine: Optional[RuleEngine] = None):
+        # 워커마다 감지기(GPU)와 규칙 엔진(추적 상태)을 따로 둘 수 있음 (기본값: 전역 인스턴스)
+        self.detector = video_detector or detector
+        self.rule_engine = engine or rule_engine
+        # 규칙 엔진의 추적 상태는 비디오 단위이므로, 한 프로세서는 한 번에 비디오 하나만 처리
+        self._lock = asyncio.Lock()
         self.logger = get_logger('video_processor')
 
     async def process_video(self, video_id: str, video_path: str):
+        """비디오 처리 (이 프로세서에서 처리 중인 비디오가 있으면 끝날 때까지 대기)"""
+        async with self._lock:
+            await self._process_video(video_id, video_path)
+
+    async def _process_video(self, video_id: str, video_path: str):
         """비디오 처리 메인 함수"""
         self.logger.info(f"비디오 처리 시작: {video_id} ({video_path})")
 
@@ -29,86 +53,200 @@ class VideoProcessor:
             self.logger.info(f"처리 설정: sample_fps={sample_fps}, confidence_threshold={confidence_threshold}")
 
             # 감지기 설정 업데이트
-            detector.update_confidence_threshold(confidence_threshold)
-
-            # 비디오 프레임 분석
-            self.logger.info(f"비디오 프레임 분석 시작...")
-            frame_results = detector.detect_video_frames(video_path, sample_fps)
-
-            if not frame_results:
-                self.logger.error(f"비디오 분석 실패: {video_id}")
-                return
-
-            self.logger.info(f"분석 완료: {len(frame_results)} 프레임")
+            self.detector.update_confidence_threshold(confidence_threshold)
 
             # 분석 시작 시 규칙 새로고침 (동적 규칙 변경 반영)
             cfg.refresh_rules()
-            rule_engine.reload_rules()
-
-            # 각 프레임에 대해 규칙 평가
-            total_alerts = 0
-            total_frames = len(frame_results)
-
-            for i, (frame_number, frame, detections, timestamp_ms) in enumerate(frame_results):
-                self.logger.info(f"=== 프레임 {frame_number} 처리 중 ({i+1}/{total_frames}) ===")
-                self.logger.info(f"탐지된 객체: {len(detections)}개")
-
-                # 탐지된 객체 상세 정보
-                for det in detections:
-                    self.logger.info(
-                        f"  - {det['label']} (ID: {det['track_id']}): "
-                        f"conf={det['confidence']:.2f}, "
-                        f"pos=({det['center_x']:.0f},{det['center_y']:.0f})"
-                    )
-
-                # 분석 결과를 데이터베이스에 저장
-                await db.save_video_analysis(
-                    video_id=video_id,
-                    frame_number=frame_number,
-                    timestamp_ms=timestamp_ms,
-                    detections=detections
-                )
-
-                # 프레임 데이터 준비
-                frame_data = {
-                    'frame_number': frame_number,
-                    'timestamp_ms': timestamp_ms,
-                    'video_id': video_id
-                }
+            self.rule_engine.reload_rules()
 
-                # 규칙 엔진으로 프레임 평가
-                alerts = await rule_engine.evaluate_frame(detections, frame_data, video_id)
+            # 감지 -> 규칙 평가 -> DB 저장을 큐로 연결한 3단계 파이프라인
+            # (큐 크기 제한으로 뒷단이 밀리면 감지도 대기하며, DB 대기 중에도 GPU 추론은 계속 진행)
+            self.logger.info(f"비디오 프레임 분석 시작...")
+            rule_queue = asyncio.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+            db_queue = asyncio.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+            stats = {'frames': 0, 'alerts': 0}
+            # 진행률 표시용 전체 프레임 수 (메타데이터 기반 추정치)
+            total_frames = self.detector.count_sampled_frames(video_path, sample_fps)
+
+            async def infer_producer():
+                stats['frames'] = await self.detector.stream_video_frames_async(
+                    video_path, rule_queue.put, sample_fps, cfg.get('batch_size', 16)
+                )
+                # 종료 신호는 정상 종료 시에만 (다른 단계가 실패해 취소된 경우 아무도 큐를 비우지 않으므로 보내지 않음)
+                await rule_queue.put(None)
+
+            async def rule_worker():
+                processed = 0
+                detected_since_log = 0
+                last_logged = 0  # 마지막 진행률 로그 시점의 처리 프레임 수
+                last_progress_step = 0
+                debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+                while (item := await rule_queue.get()) is not None:
+                    frame_number, detections, timestamp_ms = item
+                    processed += 1
+                    detected_since_log += len(detections)
+
+                    # 프레임별 탐지 요약 로그는 DEBUG에서만 (꺼져 있으면 문자열을 만들지 않음)
+                    if debug_enabled:
+                        self.logger.debug("=== 프레임 %d 처리 중 (%d번째) === 탐지: %s",
+                                          frame_number, processed, detections.summary())
+
+                    # INFO에는 진행률(정수 %)이 바뀔 때만 요약을 남김
+                    # (전체 프레임 수를 모르면 LOG_INTERVAL_FRAMES 프레임마다)
+                    if total_frames:
+                        progress_step = min(processed * 100 // total_frames, 100)
+                    else:
+                        progress_step = processed // self.LOG_INTERVAL_FRAMES
+                    if progress_step != last_progress_step:
+                        if total_frames:
+                            self.logger.info("처리 진행률: %d%% (%d/%d) - 최근 %d프레임 탐지 객체 %d개, 누적 알림 %d개",
+                                             progress_step, processed, total_frames,
+                                             processed - last_logged, detected_since_log, stats['alerts'])
+                        else:
+                            self.logger.info("처리 진행: %d프레임 - 최근 %d프레임 탐지 객체 %d개, 누적 알림 %d개",
+                                             processed, processed - last_logged, detected_since_log, stats['alerts'])
+                        last_progress_step = progress_step
+                        last_logged = processed
+                        detected_since_log = 0
+
+                    # 프레임 데이터 준비
+                    frame_data = {
+                        'frame_number': frame_number,
+                        'timestamp_ms': timestamp_ms,
+                        'video_id': video_id
+                    }
+
+                    # 규칙 엔진으로 프레임 평가
+                    alerts = await self.rule_engine.evaluate_frame(detections, frame_data, video_id)
+
+                    if alerts:
+                        stats['alerts'] += len(alerts)
+                        self.logger.info("프레임 %d: %d개 알림 생성", frame_number, len(alerts))
+                        for alert in alerts:
+                            self.logger.info("  - %s", alert.get('summary', '알림'))
+
+                    await db_queue.put((frame_number, detections, timestamp_ms))
+                await db_queue.put(None)
+
+            async def save_pending(pending):
+                # 객체별 dict 변환은 이벤트 루프 밖(포맷팅 전용 스레드)에서 수행
+                rows = await asyncio.get_running_loop().run_in_executor(_FORMAT_EXECUTOR, _build_analysis_rows, pending)
+                await db.save_video_analysis_batch(video_id, rows)
+
+            async def db_worker():
+                # 분석 결과를 모아서 DB_BATCH_SIZE 프레임마다 한 번에 저장
+                pending_rows = []
+                received = 0
+                try:
+                    while (item := await db_queue.get()) is not None:
+                        frame_number, detections, timestamp_ms = item
+                        received += 1
+
+                        # 탐지가 없는 프레임은 저장하지 않음 (HEARTBEAT_FRAMES마다 진행 기록용 빈 결과만 저장)
+                        if not len(detections) and received % self.HEARTBEAT_FRAMES != 1:
+                            continue
+                        pending_rows.append((frame_number, timestamp_ms, detections))
+
+                        if len(pending_rows) >= self.DB_BATCH_SIZE:
+                            # 저장 전에 비워 두어, 저장이 실패해도 같은 배치를 다시 보내지 않음
+                            batch, pending_rows = pending_rows, []
+                            await save_pending(batch)
+                except asyncio.CancelledError:
+                    # 다른 단계의 실패로 취소되어도 이미 처리된 프레임은 저장
+                    if pending_rows:
+                        await save_pending(pending_rows)
+                    raise
+
+                # 남은 결과 저장
+                if pending_rows:
+                    await save_pending(pending_rows)
+
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(infer_producer())
+                tg.create_task(rule_worker())
+                tg.create_task(db_worker())
+
+            if not stats['frames']:
+                self.logger.error(f"비디오 분석 실패: {video_id}")
+                return
 
-                if alerts:
-                    total_alerts += len(alerts)
-                    self.logger.info(f"프레임 {frame_number}: {len(alerts)}개 알림 생성")
-                    for alert in alerts:
-                        self.logger.info(f"  - {alert.get('summary', '알림')}")
+            self.logger.info(f"분석 완료: {stats['frames']} 프레임")
 
-                # 처리 진행률 표시 (올바른 계산)
-                progress = ((i + 1) / total_frames) * 100
-                self.logger.info(f"처리 진행률: {progress:.1f}% ({i+1}/{total_frames})")
+            # 백그라운드 DB 쓰기가 끝난 뒤 완료 처리
+            await self.rule_engine.flush_writes()
 
             self.logger.info(f"비디오 처리 완료: {video_id}")
-            self.logger.info(f"총 {total_alerts}개 알림 생성")
+            self.logger.info(f"총 {stats['alerts']}개 알림 생성")
 
         except Exception as e:
-            self.logger.error(f"비디오 처리 중 오류 발생: {video_id} - {e}")
+            # 파이프라인(TaskGroup) 실패는 감싸진 실제 원인 예외를 기록
+            errors = e.exceptions if isinstance(e, ExceptionGroup) else (e,)
+            self.logger.error(f"비디오 처리 중 오류 발생: {video_id} - {'; '.join(map(str, errors))}")
         finally:
             # 임시 파일 정리 (선택사항)
             # os.remove(video_path)
             pass
 
+# 전역 비디오 프로세서 (전역 감지기/규칙 엔진 사용, 첫 번째 워커도 이 인스턴스를 사용)
+video_processor = VideoProcessor()
+
 async def process_video(video_id: str, video_path: str):
-    """비디오 처리를 위한 비동기 함수"""
-    processor = VideoProcessor()
-    await processor.process_video(video_id, video_path)
+    """비디오 처리를 위한 비동기 함수 (워커 큐를 거치지 않고 직접 처리)"""
+    await video_processor.process_video(video_id, video_path)
+
+# 분석 대기 중인 비디오 큐와 이를 처리하는 워커 태스크
+# (요청마다 태스크를 만들지 않고, 정해진 수의 워커만 GPU를 사용)
+_video_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_worker_logger = get_logger('video_worker')
+
+async def _worker(worker_id: int, processor: VideoProcessor, device: Optional[str] = None):
+    """큐에서 비디오를 하나씩 꺼내 순서대로 처리 (device를 지정하면 먼저 해당 GPU 전용 감지기 생성)"""
+    if device is not None:
+        # 모델 로드/TensorRT 엔진 빌드는 오래 걸리므로 이벤트 루프를 막지 않도록 스레드에서 수행
+        try:
+            processor.detector = await asyncio.get_running_loop().run_in_executor(None, create_detector, device)
+        except Exception as e:
+            # 이 워커만 종료 (큐에 쌓인 비디오는 다른 워커가 처리)
+            _worker_logger.error(f"워커 {worker_id} 감지기 생성 실패 ({device}): {e}")
+            return
+
+    while True:
+        job = await _video_queue.get()
+        try:
+            await processor.process_video(**job)
+        except Exception as e:
+            _worker_logger.error(f"워커 {worker_id} 비디오 처리 실패: {job['video_id']} - {e}")
+        finally:
+            _video_queue.task_done()
+
+def start_video_workers(num_workers: Optional[int] = None):
+    """비디오 처리 워커 시작 (앱 시작 시 한 번, 이미 실행 중이면 무시)"""
+    global _video_queue
+    if _workers:
+        return
+
+    gpu_count = torch.cuda.device_count() if cfg.get('multi_gpu', True) else 0
+    if gpu_count > 1:
+        # GPU마다 전용 감지기를 둔 워커 하나씩 (첫 GPU는 전역 감지기 사용, 나머지는 워커 태스크 안에서 생성)
+        workers = [(video_processor, None)] + [
+            (VideoProcessor(engine=RuleEngine()), f"cuda:{i}") for i in range(1, gpu_count)
+        ]
+    else:
+        # 같은 감지기를 공유 (감지 호출은 감지기 내부 잠금으로 직렬화되고, 디코딩/규칙 평가/DB 저장은 겹쳐서 진행)
+        # 동시에 처리되는 비디오끼리 추적 상태가 섞이지 않도록 규칙 엔진은 워커마다 따로
+        num_workers = max(1, num_workers or cfg.get('video_workers', 1))
+        workers = [(video_processor if i == 0 else VideoProcessor(engine=RuleEngine()), None) for i in range(num_workers)]
+
+    _video_queue = asyncio.Queue()
+    _workers.extend(asyncio.create_task(_worker(i, processor, device)) for i, (processor, device) in enumerate(workers))
+    _worker_logger.info(f"비디오 처리 워커 {len(workers)}개 시작 (GPU {gpu_count}개)")
 
 # 비동기 처리를 위한 함수
 async def process_video_async(video_id: str, video_path: str):
-    """비동기 비디오 처리"""
-    # 비동기로 직접 실행
-    asyncio.create_task(process_video(video_id, video_path))
+    """비동기 비디오 처리 (워커 큐에 등록)"""
+    start_video_workers()
+    await _video_queue.put({"video_id": video_id, "video_path": video_path})
 
     return {
         "video_id": video_id,